@@ -1,4 +1,7 @@
 # app.py
+import os
+import threading
+
 import streamlit as st
 
 # Page configuration - MUST be the first Streamlit command
@@ -37,14 +40,37 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Set HFP_WARMUP=1 to import the other pages and load the models in the background
+# once the first page has been drawn, so the first visit to them is fast
+WARMUP = os.environ.get('HFP_WARMUP') == '1'
+
+# Set HFP_ADMIN=1 to add the prediction metrics page to the navigation
+ADMIN = os.environ.get('HFP_ADMIN') == '1'
+
+def warm_up():
+    """Import the heavy pages and preload the Predictor's models"""
+    import pages.Data_Info
+    import pages.EDA
+    import pages.Predictor as predictor_page
+    predictor_page.warm_up()
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    # Cached so the thread starts once per server process, not once per rerun
+    thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+    thread.start()
+    return thread
+
 def main():
     # Sidebar navigation
     st.sidebar.title("❤️ Navigation")
     st.sidebar.markdown("---")
     
     # Page selection
-    page = st.sidebar.radio("Select a page:", 
-                           ["🏠 Home", "📊 Data Information", "📈 EDA & Findings", "❤️ Heart Failure Predictor"])
+    page_names = ["🏠 Home", "📊 Data Information", "📈 EDA & Findings", "❤️ Heart Failure Predictor"]
+    if ADMIN:
+        page_names.append("🛠️ Admin")
+    page = st.sidebar.radio("Select a page:", page_names)
     
     # Load the selected page
     if page == "🏠 Home":
@@ -59,6 +85,13 @@ def main():
     elif page == "❤️ Heart Failure Predictor":
         import pages.Predictor as predictor_page
         predictor_page.show()
+    elif page == "🛠️ Admin":
+        import pages.Admin as admin_page
+        admin_page.show()
+    
+    # Pages are imported only when selected, so heavy libraries stay out of the first paint
+    if WARMUP:
+        start_warm_up()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
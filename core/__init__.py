@@ -0,0 +1,2 @@
+# core/__init__.py
+"""Model inference and data helpers shared by the Streamlit pages and scripts"""
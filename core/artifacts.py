@@ -0,0 +1,164 @@
+# core/artifacts.py
+"""Pickle-free model artifacts: .npy arrays plus a JSON manifest
+
+Numeric arrays are memory-mapped read-only when a model is first used,
+so processes serving the same files share one copy of the pages. Each
+conversion writes a new set directory and then swaps the manifest, so
+files a server has mapped are never rewritten.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
+from core.compact import CompactForest
+from core.forest import FlatForest
+from core.linear import FastLogistic
+from core.models import DATA_DIR, MODEL_FILES, load_model_files, model_dir
+from core.neighbors import IndexedKNN
+
+ARTIFACT_DIR = os.path.join(DATA_DIR, 'arrays')
+MANIFEST_NAME = 'manifest.json'
+FORMAT_VERSION = 1
+SET_PREFIX = 'set-'
+
+# Engines written by the converter; KNN searches its mapped points in place
+ARTIFACT_ENGINES = {
+    'Logistic Regression': 'closed_form',
+    'Random Forest': 'flat',
+    'K-Nearest Neighbors': 'brute',
+}
+
+# Class that restores each engine from its arrays and params
+ENGINE_CLASSES = {
+    'closed_form': FastLogistic,
+    'flat': FlatForest,
+    'compact': CompactForest,
+    'kd_tree': IndexedKNN,
+    'ball_tree': IndexedKNN,
+    'brute': IndexedKNN,
+    'kd_tree_scaled': IndexedKNN,
+}
+
+
+def read_manifest(out_dir):
+    with open(os.path.join(out_dir, MANIFEST_NAME)) as file:
+        return json.load(file)
+
+
+def manifest_sets(manifest):
+    """Set directories a manifest's arrays live in"""
+    return {path.split('/', 1)[0] for entry in manifest['models'].values() for path in entry['arrays'].values()}
+
+
+def convert_models(data_dir=DATA_DIR, out_dir=ARTIFACT_DIR, engines=None):
+    """Convert the pickled models into .npy arrays and a manifest; returns the manifest
+
+    The arrays go into a fresh set directory and the manifest is swapped in
+    last, via rename, so readers never see a half-written set. The set the
+    previous manifest pointed to is kept for readers still loading from it;
+    older sets are removed.
+    """
+    engines = {**ARTIFACT_ENGINES, **(engines or {})}
+    models = load_model_files(data_dir, engines)
+    manifest = {'format': FORMAT_VERSION, 'models': {}}
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        keep = manifest_sets(read_manifest(out_dir))
+    except FileNotFoundError:
+        keep = set()
+    set_dir = tempfile.mkdtemp(prefix=time.strftime(f'{SET_PREFIX}%Y%m%d-%H%M%S-'), dir=out_dir)
+    set_name = os.path.basename(set_dir)
+    os.chmod(set_dir, 0o755)
+
+    for model_name, model in models.items():
+        slug = os.path.splitext(MODEL_FILES[model_name])[0]
+        os.makedirs(os.path.join(set_dir, slug))
+        arrays, params = model.to_arrays()
+
+        files = {}
+        for key, array in arrays.items():
+            files[key] = f"{set_name}/{slug}/{key}.npy"
+            np.save(os.path.join(out_dir, files[key]), np.ascontiguousarray(array))
+
+        source = os.path.join(model_dir(data_dir), MODEL_FILES[model_name])
+        manifest['models'][model_name] = {
+            'engine': engines[model_name],
+            'arrays': files,
+            'params': params,
+            'source': MODEL_FILES[model_name],
+            'source_path': os.path.abspath(source),
+            'source_mtime_ns': os.stat(source).st_mtime_ns,
+        }
+
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix=MANIFEST_NAME, suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(manifest, file, indent=2)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, os.path.join(out_dir, MANIFEST_NAME))
+
+    for name in os.listdir(out_dir):
+        if name.startswith(SET_PREFIX) and name != set_name and name not in keep:
+            shutil.rmtree(os.path.join(out_dir, name), ignore_errors=True)
+    return manifest
+
+
+def check_source(entry):
+    """Raise ValueError if the pickle an entry was converted from has changed since"""
+    path = entry.get('source_path')
+    if path is None or not os.path.exists(path):
+        # Deployed without the pickles; there is nothing to be stale against
+        return
+    if os.stat(path).st_mtime_ns != entry['source_mtime_ns']:
+        raise ValueError(f"Stale artifact: {entry['source']} changed after it was converted; "
+                         f"re-run scripts/convert_models.py")
+
+
+def load_artifact(out_dir, entry, mmap_mode='r'):
+    """Materialize one model from its manifest entry, refusing it if its source pickle has changed"""
+    check_source(entry)
+    arrays = {
+        key: np.load(os.path.join(out_dir, path), mmap_mode=mmap_mode, allow_pickle=False)
+        for key, path in entry['arrays'].items()
+    }
+    return ENGINE_CLASSES[entry['engine']].from_arrays(arrays, entry['params'])
+
+
+class LazyModels(Mapping):
+    """Read-only mapping of display name -> model that loads each model on first access"""
+
+    def __init__(self, out_dir=ARTIFACT_DIR, mmap_mode='r'):
+        self.out_dir = out_dir
+        self.mmap_mode = mmap_mode
+        self.manifest = read_manifest(out_dir)
+        if self.manifest.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported artifact format: {self.manifest.get('format')}")
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, model_name):
+        model = self._models.get(model_name)
+        if model is None:
+            entry = self.manifest['models'][model_name]
+            with self._lock:
+                model = self._models.get(model_name)
+                if model is None:
+                    model = load_artifact(self.out_dir, entry, self.mmap_mode)
+                    self._models[model_name] = model
+        return model
+
+    def __iter__(self):
+        return iter(self.manifest['models'])
+
+    def __len__(self):
+        return len(self.manifest['models'])
+
+    @property
+    def loaded(self):
+        """Names of the models materialized so far"""
+        return list(self._models)
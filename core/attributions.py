@@ -0,0 +1,210 @@
+# core/attributions.py
+"""Per-prediction feature attributions for every model, vectorized over batches
+
+Each explainer answers a whole batch with the same array passes the model
+uses to score it, and its base value plus a row's contributions adds up
+exactly to the model's own output for that row:
+
+- Logistic Regression: coef * (x - background mean), in log-odds
+- Random Forest: path attributions; every split on the way to a leaf
+  credits its feature with the change in the node's heart disease rate
+- K-Nearest Neighbors: each neighbour's vote, relative to the reference
+  rate, is shared between the features that make the patient close to it
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+
+from core.features import FEATURE_COLUMNS
+from core.compact import CompactForest
+from core.forest import FlatForest
+from core.linear import FastLogistic
+from core.neighbors import IndexedKNN
+
+# Rows per Random Forest pass: large enough for FlatForest.apply to use sklearn's compiled
+# walk, small enough that the (rows, trees) leaf matrix stays around 50 MB
+FOREST_EXPLAIN_ROWS = 8_192
+
+# Rows per KNN pass; the (rows, neighbours, features) gap array stays around 100 MB
+NEIGHBOR_CHUNK_ROWS = 10_000
+
+
+class Attribution:
+    """Base values and per-feature contributions for a batch of rows
+
+    base has one value per row and contributions one column per feature;
+    base + contributions.sum(axis=1) is the model output in the given units
+    ('log-odds' or 'probability').
+    """
+
+    def __init__(self, base, contributions, units):
+        self.base = base
+        self.contributions = contributions
+        self.units = units
+
+    @property
+    def output(self):
+        return self.base + self.contributions.sum(axis=1)
+
+    def frame(self, index=None):
+        return pd.DataFrame(self.contributions, columns=FEATURE_COLUMNS, index=index)
+
+    def row(self, i):
+        """Contributions of one row as a Series, largest effect first"""
+        contributions = pd.Series(self.contributions[i], index=FEATURE_COLUMNS)
+        return contributions.reindex(contributions.abs().sort_values(ascending=False).index)
+
+
+class LinearExplainer:
+    """Exact contributions of a binary logistic regression in log-odds space
+
+    The logit is intercept + coef . x, which splits into the logit at the
+    background mean plus coef_j * (x_j - mean_j) per feature. Without a
+    background the mean is zero and the base is the intercept.
+    """
+
+    units = 'log-odds'
+
+    def __init__(self, coef, intercept, background=None):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.mean = np.zeros_like(self.coef) if background is None else np.asarray(background).mean(axis=0)
+        self.base_value = float(np.asarray(intercept).ravel()[0] + self.coef @ self.mean)
+
+    def explain(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        contributions = (X - self.mean) * self.coef
+        return Attribution(np.full(len(X), self.base_value), contributions, self.units)
+
+
+class ForestExplainer:
+    """Path attributions for a FlatForest, averaged over its trees
+
+    Walking from a root to a leaf, each split credits its feature with the
+    child's minus the parent's class-1 rate. Those sums depend only on the
+    leaf, so they are tabulated once per node. Explaining a batch is then
+    FlatForest.apply plus one sparse product: a (rows, nodes) matrix with a
+    1 at each row's leaf in every tree, times the table. Base (the mean
+    root rate) plus contributions is exactly the forest's predict_proba.
+    """
+
+    units = 'probability'
+
+    def __init__(self, forest, n_features=len(FEATURE_COLUMNS)):
+        self.forest = forest
+        positive = forest.value[:, 1]
+        self.base_value = float(positive[forest.roots].mean())
+
+        # Path contributions of every node, filled in one tree level at a time
+        paths = np.zeros((len(positive), n_features))
+        nodes = forest.roots
+        for _ in range(forest.max_depth):
+            nodes = nodes[forest.children[nodes, 0] != nodes]
+            for side in (0, 1):
+                children = forest.children[nodes, side]
+                paths[children] = paths[nodes]
+                paths[children, forest.feature[nodes]] += positive[children] - positive[nodes]
+            nodes = forest.children[nodes].ravel()
+        self.paths = paths
+
+    def explain(self, X):
+        X = np.asarray(X)
+        n_trees, n_nodes = self.forest.n_trees, len(self.paths)
+        contributions = np.empty((len(X), self.paths.shape[1]))
+        for start in range(0, len(X), FOREST_EXPLAIN_ROWS):
+            leaves = self.forest.apply(X[start:start + FOREST_EXPLAIN_ROWS]).ravel()
+            rows = sparse.csr_matrix(
+                (np.ones(len(leaves)), leaves, np.arange(0, len(leaves) + 1, n_trees, dtype=np.int32)),
+                shape=(len(leaves) // n_trees, n_nodes), copy=False,
+            )
+            contributions[start:start + rows.shape[0]] = rows @ self.paths
+        contributions /= n_trees
+        return Attribution(np.full(len(X), self.base_value), contributions, self.units)
+
+
+class NeighborExplainer:
+    """Neighbour-based contributions for an IndexedKNN
+
+    The risk is the weighted share of positive neighbours. Each neighbour
+    moves it from the reference rate by weight * (vote - rate), and that
+    amount is split across features in proportion to how much closer
+    each feature puts the patient to the neighbour than to a typical
+    reference patient (squared gaps, in the index's feature space). The
+    contributions therefore add up to the KNN risk minus the reference rate.
+    """
+
+    units = 'probability'
+
+    def __init__(self, knn):
+        self.knn = knn
+        reference = knn._transform(knn._X)
+        self.reference = reference
+        self.mean = reference.mean(axis=0)
+        self.var = reference.var(axis=0)
+        self.positive = knn._y == 1
+        self.base_value = float(self.positive.mean())
+
+    def _weights(self, distances):
+        if self.knn.weights == 'uniform':
+            weights = np.ones_like(distances)
+        else:
+            # As IndexedKNN.predict_proba: exact matches take all the weight
+            with np.errstate(divide='ignore'):
+                weights = 1.0 / distances
+            exact = np.isinf(weights)
+            exact_rows = exact.any(axis=1)
+            weights[exact_rows] = exact[exact_rows]
+        return weights / weights.sum(axis=1, keepdims=True)
+
+    def _contributions(self, X):
+        distances, indices = self.knn.kneighbors(X)
+        shifts = self._weights(distances) * (self.positive[indices] - self.base_value)
+
+        Z = self.knn._transform(X)
+        gaps = (Z[:, np.newaxis, :] - self.reference[indices]) ** 2
+        # Expected squared gap to a random reference patient, per feature
+        typical = (Z - self.mean) ** 2 + self.var
+        gains = np.maximum(typical[:, np.newaxis, :] - gaps, 0)
+        totals = gains.sum(axis=2, keepdims=True)
+        shares = np.where(totals > 0, gains / np.where(totals > 0, totals, 1), 1 / Z.shape[1])
+        return np.einsum('nk,nkj->nj', shifts, shares)
+
+    def explain(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        contributions = np.empty(X.shape, dtype=np.float64)
+        for start in range(0, len(X), NEIGHBOR_CHUNK_ROWS):
+            contributions[start:start + NEIGHBOR_CHUNK_ROWS] = self._contributions(X[start:start + NEIGHBOR_CHUNK_ROWS])
+        return Attribution(np.full(len(X), self.base_value), contributions, self.units)
+
+
+def unwrap(model):
+    """The underlying model of a serving wrapper (CoalescedModel, TableModel)"""
+    while hasattr(model, 'model'):
+        model = model.model
+    return model
+
+
+def make_explainer(model, background=None):
+    """Explainer for any served model; background rows set the logistic baseline"""
+    model = unwrap(model)
+    if isinstance(model, LogisticRegression):
+        return LinearExplainer(model.coef_, model.intercept_, background)
+    if isinstance(model, FastLogistic):
+        return LinearExplainer(model.coef_T.T, model.intercept, background)
+    if isinstance(model, RandomForestClassifier):
+        return ForestExplainer(FlatForest.from_sklearn(model))
+    if isinstance(model, FlatForest):
+        return ForestExplainer(model)
+    if isinstance(model, CompactForest):
+        return ForestExplainer(model.to_flat())
+    if isinstance(model, KNeighborsClassifier):
+        return NeighborExplainer(IndexedKNN.from_sklearn(model, index='brute'))
+    if isinstance(model, IndexedKNN):
+        return NeighborExplainer(model)
+    raise TypeError(f"No attribution method for {type(model).__name__}")
+
+
+def make_explainers(models, background=None):
+    return {model_name: make_explainer(model, background) for model_name, model in models.items()}
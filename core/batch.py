@@ -0,0 +1,153 @@
+# core/batch.py
+import io
+import os
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from core.dataset import DEFAULT_CHUNKSIZE, iter_dataset
+from core.features import FEATURE_COLUMNS
+from core.metrics import METRICS
+from core.validation import validate_frame
+
+
+def model_slug(model_name):
+    """Turn a display name like 'K-Nearest Neighbors' into a column prefix"""
+    return model_name.lower().replace('-', '_').replace(' ', '_')
+
+
+def to_matrix(data):
+    """Return the 13 model features of a cohort as a contiguous float64 matrix"""
+    missing = [col for col in FEATURE_COLUMNS if col not in data.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+    return np.ascontiguousarray(data[FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+
+
+def stage_timer(model_name, stage):
+    """Time a prediction stage in METRICS, or do nothing for an unnamed model"""
+    if model_name is None:
+        return nullcontext()
+    return METRICS.timer('hfp_prediction_stage_seconds', model=model_name, stage=stage)
+
+
+def predict_matrix(model, X, model_name=None):
+    """Score every row of X with a single predict_proba call
+
+    Returns (predictions, heart disease probabilities, confidences) as arrays.
+    With a model_name the call, its rows and any error are counted, and the
+    predict_proba and predict (class selection) stages are timed.
+    """
+    if model_name is not None:
+        METRICS.inc('hfp_predictions_total', model=model_name)
+        METRICS.inc('hfp_rows_scored_total', len(X), model=model_name)
+    try:
+        with stage_timer(model_name, 'predict_proba'):
+            proba = model.predict_proba(X)
+        with stage_timer(model_name, 'predict'):
+            best = proba.argmax(axis=1)
+            predictions = model.classes_[best]
+            confidences = proba[np.arange(len(best)), best]
+    except Exception:
+        if model_name is not None:
+            METRICS.inc('hfp_prediction_errors_total', model=model_name)
+        raise
+    return predictions, proba[:, 1], confidences
+
+
+def empty_scored(data, models, explainers=None):
+    """The zero-row frame score_frame returns for a chunk with nothing to score, with the same columns"""
+    result = data.iloc[:0].copy()
+    for model_name in models:
+        slug = model_slug(model_name)
+        result[f'{slug}_prediction'] = pd.Series(dtype=np.int64)
+        result[f'{slug}_probability'] = pd.Series(dtype=np.float64)
+    for model_name in explainers or {}:
+        slug = model_slug(model_name)
+        result[f'{slug}_base'] = pd.Series(dtype=np.float64)
+        for col in FEATURE_COLUMNS:
+            result[f'{slug}_{col}_contribution'] = pd.Series(dtype=np.float64)
+    return result
+
+
+def score_frame(models, data, executor=None, explainers=None, rejects=None):
+    """Score a cohort DataFrame with every model, one call per model
+
+    Returns a copy of the input with a prediction and a probability column
+    for each model. With an EnsembleExecutor the models run concurrently.
+    With explainers (see core.attributions) each explained model also gets
+    a base column and one contribution column per feature.
+
+    Rows are checked against the feature schema before any model sees them.
+    Invalid rows are dropped and their ValidationReport appended to rejects;
+    without a rejects list any invalid row raises InvalidRows.
+    """
+    with stage_timer('all', 'build_input'):
+        X, report = validate_frame(data)
+    if rejects is None:
+        report.raise_for_invalid()
+    elif not report.ok:
+        rejects.append(report)
+        X, data = X[report.valid], data[report.valid]
+    if not len(X):
+        # Nothing valid in this chunk (or a header-only upload): no model is called on zero rows
+        return empty_scored(data, models, explainers)
+    if executor is None:
+        scores = {model_name: predict_matrix(model, X, model_name) for model_name, model in models.items()}
+    else:
+        scores, _, failures = executor.run(X, list(models))
+        if failures:
+            raise RuntimeError("; ".join(f"{name}: {error}" for name, error in failures.items()))
+
+    result = data.copy()
+    for model_name, (predictions, probabilities, _) in scores.items():
+        slug = model_slug(model_name)
+        result[f'{slug}_prediction'] = predictions
+        result[f'{slug}_probability'] = probabilities
+    for model_name, explainer in (explainers or {}).items():
+        slug = model_slug(model_name)
+        with stage_timer(model_name, 'explain'):
+            attribution = explainer.explain(X)
+        result[f'{slug}_base'] = attribution.base
+        for col, contributions in zip(FEATURE_COLUMNS, attribution.contributions.T):
+            result[f'{slug}_{col}_contribution'] = contributions
+    return result
+
+
+def score_csv(models, source, chunksize=DEFAULT_CHUNKSIZE, executor=None, explainers=None, rejects=None):
+    """Yield scored DataFrames for a CSV file read in chunks
+
+    A path is read through the columnar dataset cache; a buffer (such as an
+    upload) is parsed directly.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        chunks = iter_dataset(source, chunksize=chunksize)
+    else:
+        chunks = pd.read_csv(source, chunksize=chunksize)
+    for chunk in chunks:
+        yield score_frame(models, chunk, executor=executor, explainers=explainers, rejects=rejects)
+
+
+def stream_csv(models, source, chunksize=DEFAULT_CHUNKSIZE, executor=None, explainers=None, rejects=None):
+    """Yield the scored cohort as CSV text, one chunk at a time"""
+    header = True
+    for scored in score_csv(models, source, chunksize=chunksize, executor=executor, explainers=explainers,
+                            rejects=rejects):
+        buffer = io.StringIO()
+        scored.to_csv(buffer, index=False, header=header)
+        header = False
+        yield buffer.getvalue()
+
+
+def write_csv(models, source, path, chunksize=DEFAULT_CHUNKSIZE, executor=None, explainers=None, rejects=None):
+    """Score a cohort into a CSV file one chunk at a time; returns the number of rows written"""
+    rows = 0
+    header = True
+    with open(path, 'w', newline='') as file:
+        for scored in score_csv(models, source, chunksize=chunksize, executor=executor, explainers=explainers,
+                                rejects=rejects):
+            scored.to_csv(file, index=False, header=header)
+            header = False
+            rows += len(scored)
+    return rows
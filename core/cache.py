@@ -0,0 +1,136 @@
+# core/cache.py
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from core.metrics import METRICS
+
+DEFAULT_MAXSIZE = 4096
+
+
+class PredictionCache:
+    """Bounded LRU/TTL cache of (prediction, probability, confidence) results
+
+    Entries are keyed by model name and the 13-value feature vector. Each
+    lookup passes the version of the model that answers (see core.registry);
+    when it differs from the one cached entries were stored under, all
+    entries for that model are dropped. An optional SQLite file acts as a
+    second tier that survives restarts; its rows are keyed by version too,
+    so processes serving different versions never read each other's.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=None, disk_path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0,
+                         'expirations': 0, 'invalidations': 0}
+
+        self._db = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            columns = self._db.execute("PRAGMA table_info(predictions)").fetchall()
+            if columns and not any(name == 'version' and pk for _, name, _, _, _, pk in columns):
+                # Written before the version was part of the key; it is only a cache, so start over
+                self._db.execute("DROP TABLE predictions")
+            # Processes on different versions share the file, so each version keeps its own rows
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " model TEXT, features TEXT, version TEXT, result TEXT, created REAL,"
+                " PRIMARY KEY (model, version, features))"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def _features_key(features):
+        return tuple(float(value) for value in features)
+
+    def _expired(self, created):
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _check_version(self, model_name, version):
+        if self._versions.get(model_name) == version:
+            return
+        if model_name in self._versions:
+            stale = [key for key in self._entries if key[0] == model_name]
+            for key in stale:
+                del self._entries[key]
+            self.counters['invalidations'] += len(stale)
+        if self._db is not None:
+            self._db.execute("DELETE FROM predictions WHERE model = ? AND version != ?",
+                             (model_name, version))
+            self._db.commit()
+        self._versions[model_name] = version
+
+    def get(self, model_name, version, features):
+        """Return the cached result tuple, or None on a miss"""
+        key = (model_name, self._features_key(features))
+        with self._lock:
+            self._check_version(model_name, version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, created = entry
+                if not self._expired(created):
+                    self._entries.move_to_end(key)
+                    self.counters['hits'] += 1
+                    METRICS.inc('hfp_cache_requests_total', model=model_name, result='hit')
+                    return result
+                del self._entries[key]
+                self.counters['expirations'] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT result, created FROM predictions WHERE model = ? AND version = ? AND features = ?",
+                    (model_name, version, json.dumps(key[1]))
+                ).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    result = tuple(json.loads(row[0]))
+                    self._store(key, result, row[1])
+                    self.counters['disk_hits'] += 1
+                    METRICS.inc('hfp_cache_requests_total', model=model_name, result='disk_hit')
+                    return result
+
+            self.counters['misses'] += 1
+            METRICS.inc('hfp_cache_requests_total', model=model_name, result='miss')
+            return None
+
+    def _store(self, key, result, created):
+        self._entries[key] = (result, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.counters['evictions'] += 1
+
+    def put(self, model_name, version, features, result):
+        """Cache a (prediction, probability, confidence) result"""
+        key = (model_name, self._features_key(features))
+        result = (int(result[0]), float(result[1]), float(result[2]))
+        created = time.time()
+        with self._lock:
+            self._check_version(model_name, version)
+            self._store(key, result, created)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                    (model_name, json.dumps(key[1]), version, json.dumps(result), created)
+                )
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            counters['size'] = len(self._entries)
+        lookups = counters['hits'] + counters['disk_hits'] + counters['misses']
+        counters['hit_rate'] = (counters['hits'] + counters['disk_hits']) / lookups if lookups else 0.0
+        return counters
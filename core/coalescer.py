@@ -0,0 +1,155 @@
+# core/coalescer.py
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+class MicroBatcher:
+    """Gather concurrent single-row requests and score them in one call
+
+    A background thread waits up to max_wait_ms after the oldest queued row
+    (or until max_batch_size rows are queued), stacks the rows into one
+    matrix, calls score_fn once and hands each caller its own result row.
+    close() stops the thread once the rows queued before it are scored.
+    """
+
+    def __init__(self, score_fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, history=10_000):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._queue_waits = deque(maxlen=history)
+        self.closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        """Queue one feature row and return a Future for its result"""
+        future = Future()
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((np.asarray(row, dtype=np.float64), future, time.perf_counter()))
+        return future
+
+    def close(self):
+        """Score the rows already queued, then stop the background thread"""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self._queue.put(None)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        if batch[0] is None:
+            return []
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Rows that queued up behind a slow batch are taken without waiting
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Stop after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+            dispatched = time.perf_counter()
+            with self._lock:
+                self._batch_sizes[len(batch)] += 1
+                self._queue_waits.extend(dispatched - enqueued for _, _, enqueued in batch)
+
+            try:
+                results = self.score_fn(np.vstack([row for row, _, _ in batch]))
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        """Batch-size histogram and queue-wait percentiles (ms) since start"""
+        with self._lock:
+            histogram = dict(sorted(self._batch_sizes.items()))
+            waits = np.array(self._queue_waits) * 1000
+        batches = sum(histogram.values())
+        rows = sum(size * count for size, count in histogram.items())
+        queue_wait_ms = {}
+        if len(waits):
+            queue_wait_ms = {
+                'p50': float(np.percentile(waits, 50)),
+                'p90': float(np.percentile(waits, 90)),
+                'p99': float(np.percentile(waits, 99)),
+                'max': float(waits.max()),
+            }
+        return {
+            'batches': batches,
+            'rows': rows,
+            'mean_batch_size': rows / batches if batches else 0.0,
+            'batch_size_histogram': histogram,
+            'queue_wait_ms': queue_wait_ms,
+        }
+
+
+class CoalescedModel:
+    """Drop-in model wrapper that routes single-row predict_proba calls through a MicroBatcher
+
+    Multi-row calls are already batched, so they go straight to the model.
+    """
+
+    def __init__(self, model, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.model = model
+        self.classes_ = model.classes_
+        self.batcher = MicroBatcher(model.predict_proba, max_batch_size=max_batch_size,
+                                    max_wait_ms=max_wait_ms)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) != 1:
+            return self.model.predict_proba(X)
+        return self.batcher.submit(X[0]).result()[np.newaxis, :]
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def stats(self):
+        return self.batcher.stats()
+
+    @property
+    def closed(self):
+        return self.batcher.closed
+
+    def close(self):
+        self.batcher.close()
+
+
+def coalesce_models(models, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    """Wrap every model in a CoalescedModel with the same batching settings"""
+    return {
+        model_name: CoalescedModel(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+        for model_name, model in models.items()
+    }
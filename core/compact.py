@@ -0,0 +1,215 @@
+# core/compact.py
+"""Compacted, reduced-precision Random Forest for serving
+
+Starting from a FlatForest, compaction can keep only a subset of the trees
+(chosen to reproduce the full forest's probabilities), then stores:
+
+- the class-1 rate of every node quantized to leaf_bits (8 or 16) bits;
+- sibling leaves whose quantized rates differ by at most merge_tolerance
+  steps merged into their parent (losslessly with the default of 0);
+- float32 thresholds rounded toward -inf. Features are compared as
+  float32, and x > round_down(t) holds exactly when x > t, so no split
+  changes;
+- uint8 feature indices and child indices local to each tree, as int16
+  unless some tree has more nodes than int16 can address (then int32).
+"""
+import numpy as np
+
+from core.forest import CHUNK_CELLS, FlatForest
+
+LEAF_DTYPES = {8: np.uint8, 16: np.uint16}
+
+
+def round_down_float32(values):
+    """The largest float32 not above each float64 value"""
+    values = np.asarray(values, dtype=np.float64)
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def tree_predictions(flat, X):
+    """Class-1 rate of every tree for every row, shape (n_rows, n_trees)"""
+    return flat.value[:, 1][flat.apply(X)]
+
+
+def select_trees(flat, X, n_trees):
+    """Greedily pick n_trees whose average best matches the full forest on X
+
+    Only features are used, no labels: the subset is chosen to agree with
+    the forest it replaces, not to fit the rows it is measured on later.
+    """
+    per_tree = tree_predictions(flat, X)
+    target = per_tree.mean(axis=1, keepdims=True)
+    total = np.zeros((len(X), 1))
+    remaining = np.ones(flat.n_trees, dtype=bool)
+    chosen = []
+    for k in range(1, min(n_trees, flat.n_trees) + 1):
+        errors = (((total + per_tree) / k - target) ** 2).mean(axis=0)
+        errors[~remaining] = np.inf
+        best = int(np.argmin(errors))
+        chosen.append(best)
+        remaining[best] = False
+        total[:, 0] += per_tree[:, best]
+    return np.sort(chosen)
+
+
+class CompactForest:
+    """A FlatForest stored in small dtypes, evaluated tree-locally
+
+    children[i] holds the (left, right) indices of node i relative to its
+    tree's root (int32 only for trees beyond 32767 nodes), and value[i] the
+    node's class-1 rate in 1 / scale steps.
+    Leaves point to themselves with an infinite threshold, as in FlatForest.
+    Only binary classifiers are supported.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes, max_depth, scale):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.scale = int(scale)
+
+    @classmethod
+    def from_flat(cls, flat, trees=None, leaf_bits=8, merge_tolerance=0):
+        """Compact the given trees (default all) of a FlatForest"""
+        if len(flat.classes_) != 2:
+            raise ValueError("CompactForest only supports binary classifiers")
+        scale = 2 ** leaf_bits - 1
+        ends = np.append(flat.roots[1:], len(flat.feature))
+        trees = np.arange(flat.n_trees) if trees is None else np.asarray(trees)
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            start, end = flat.roots[tree], ends[tree]
+            local_children = flat.children[start:end] - start
+            value = np.round(flat.value[start:end, 1] * scale).astype(np.int64)
+            is_leaf = local_children[:, 0] == np.arange(end - start)
+
+            # Collapse sibling leaves with (nearly) equal rates, bottom-up
+            while True:
+                left, right = local_children[:, 0], local_children[:, 1]
+                merge = ~is_leaf & is_leaf[left] & is_leaf[right] & \
+                    (np.abs(value[left] - value[right]) <= merge_tolerance)
+                if not merge.any():
+                    break
+                nodes = np.flatnonzero(merge)
+                value[nodes] = (value[left[nodes]] + value[right[nodes]] + 1) // 2
+                local_children[nodes] = nodes[:, np.newaxis]
+                is_leaf[nodes] = True
+
+            # Drop the nodes no longer reachable and renumber the rest in order
+            reachable = np.zeros(end - start, dtype=bool)
+            frontier = np.array([0])
+            while len(frontier):
+                reachable[frontier] = True
+                frontier = local_children[frontier].ravel()
+                frontier = np.unique(frontier[~reachable[frontier]])
+            kept = np.flatnonzero(reachable)
+            renumber = np.full(end - start, -1, dtype=np.int64)
+            renumber[kept] = np.arange(len(kept))
+
+            leaf = is_leaf[kept]
+            features.append(np.where(leaf, 0, flat.feature[start:end][kept]))
+            thresholds.append(np.where(leaf, np.inf, round_down_float32(flat.threshold[start:end][kept])))
+            children.append(renumber[local_children[kept]])
+            values.append(value[kept])
+            roots.append(offset)
+            offset += len(kept)
+
+        local_dtype = np.int16 if max(map(len, children)) <= np.iinfo(np.int16).max else np.int32
+        return cls(
+            feature=np.concatenate(features).astype(np.uint8),
+            threshold=np.concatenate(thresholds).astype(np.float32),
+            children=np.concatenate(children).astype(local_dtype),
+            value=np.concatenate(values).astype(LEAF_DTYPES[leaf_bits]),
+            roots=np.array(roots, dtype=np.int32),
+            classes=np.asarray(flat.classes_),
+            max_depth=flat.max_depth,
+            scale=scale,
+        )
+
+    @classmethod
+    def from_sklearn(cls, forest, **kwargs):
+        return cls.from_flat(FlatForest.from_sklearn(forest), **kwargs)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.feature, self.threshold, self.children,
+                                              self.value, self.roots))
+
+    def to_arrays(self):
+        """(arrays, params) for the artifact format"""
+        arrays = {
+            'feature': self.feature, 'threshold': self.threshold, 'children': self.children,
+            'value': self.value, 'roots': self.roots, 'classes': self.classes_,
+        }
+        return arrays, {'max_depth': self.max_depth, 'scale': self.scale}
+
+    @classmethod
+    def from_arrays(cls, arrays, params):
+        return cls(classes=arrays['classes'], max_depth=params['max_depth'], scale=params['scale'],
+                   **{key: arrays[key] for key in ('feature', 'threshold', 'children', 'value', 'roots')})
+
+    def save(self, path):
+        """Write the node arrays to a single .npz file"""
+        arrays, params = self.to_arrays()
+        np.savez(path, **arrays, **params)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(**{key: data[key] for key in data.files})
+
+    def to_flat(self):
+        """Equivalent FlatForest (float64, global indices), e.g. for path attributions"""
+        tree_of_node = np.repeat(np.arange(self.n_trees), np.diff(np.append(self.roots, self.n_nodes)))
+        positive = self.value.astype(np.float64) / self.scale
+        return FlatForest(
+            feature=self.feature.astype(np.int32),
+            threshold=self.threshold.astype(np.float64),
+            children=(self.children + self.roots[tree_of_node][:, np.newaxis]).astype(np.int32),
+            value=np.column_stack([1 - positive, positive]),
+            roots=self.roots.copy(),
+            classes=self.classes_,
+            max_depth=self.max_depth,
+        )
+
+    def apply(self, X):
+        """Return the leaf index (global) reached in every tree, shape (n_rows, n_trees)"""
+        X = np.asarray(X, dtype=np.float32)
+        flat_X = X.ravel()
+        row_offsets = (np.arange(len(X), dtype=np.int32) * X.shape[1])[:, np.newaxis]
+
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            goes_right = flat_X[row_offsets + self.feature[node]] > self.threshold[node]
+            node = self.roots + self.children[node, goes_right.view(np.uint8)]
+        return node
+
+    def predict_proba(self, X):
+        """Average the dequantized leaf rates over all trees, in row chunks"""
+        X = np.asarray(X)
+        positive = np.empty(len(X))
+        chunk = max(1, CHUNK_CELLS // self.n_trees)
+        for start in range(0, len(X), chunk):
+            leaves = self.apply(X[start:start + chunk])
+            positive[start:start + chunk] = self.value[leaves].mean(axis=1) / self.scale
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
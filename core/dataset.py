@@ -0,0 +1,126 @@
+# core/dataset.py
+"""Columnar cache of the CSV datasets
+
+The first read of a CSV converts it, in chunks, into a zstd-compressed
+Parquet file next to the model data, with each column downcast to the
+smallest dtype that holds it. Later reads memory-map the Parquet file.
+The file is rebuilt whenever the CSV's size or modification time changes.
+"""
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CACHE_DIR = 'Data/cache'
+
+# Rows per CSV chunk, Parquet row group and yielded batch
+DEFAULT_CHUNKSIZE = 100_000
+
+# Narrowest dtype for each column of heart-disease.csv
+COLUMN_DTYPES = {
+    'age': np.int8,
+    'sex': np.int8,
+    'cp': np.int8,
+    'trestbps': np.int16,
+    'chol': np.int16,
+    'fbs': np.int8,
+    'restecg': np.int8,
+    'thalach': np.int16,
+    'exang': np.int8,
+    'oldpeak': np.float32,
+    'slope': np.int8,
+    'ca': np.int8,
+    'thal': np.int8,
+    'target': np.int8,
+}
+
+SOURCE_KEY = b'hfp_source'
+
+
+def source_fingerprint(source):
+    stat = os.stat(source)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def cache_path(source, cache_dir=CACHE_DIR):
+    """Parquet path for source, keyed on its absolute path so same-named CSVs in different directories never collide"""
+    key = hashlib.sha256(os.path.abspath(source).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(source))[0]}-{key}.parquet")
+
+
+def column_dtype(column, values):
+    """COLUMN_DTYPES entry if every value fits in it, else float32 (missing) or the original dtype"""
+    dtype = COLUMN_DTYPES.get(column)
+    if dtype is None:
+        return values.dtype
+    if np.issubdtype(dtype, np.integer):
+        if values.isna().any():
+            return np.float32
+        info = np.iinfo(dtype)
+        if values.min() < info.min or values.max() > info.max:
+            return values.dtype
+    return dtype
+
+
+def convert_csv(source, cache_dir=CACHE_DIR, chunksize=DEFAULT_CHUNKSIZE):
+    """Write source as a typed Parquet file, one row group per chunk; returns its path"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(source, cache_dir)
+    fingerprint = source_fingerprint(source)
+
+    # Dtypes are chosen from the whole file so every row group shares one schema
+    chunks = pd.read_csv(source, chunksize=chunksize)
+    first = next(chunks)
+    dtypes = {column: column_dtype(column, first[column]) for column in first.columns}
+    for chunk in chunks:
+        for column in chunk.columns:
+            if dtypes[column] != column_dtype(column, chunk[column]):
+                dtypes[column] = np.result_type(dtypes[column], column_dtype(column, chunk[column]))
+
+    # A private temporary file per writer, so concurrent conversions never interleave
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=os.path.basename(path), suffix='.tmp')
+    writer = None
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            for chunk in pd.read_csv(source, chunksize=chunksize):
+                table = pa.Table.from_pandas(chunk.astype(dtypes), preserve_index=False)
+                if writer is None:
+                    schema = table.schema.with_metadata({SOURCE_KEY: fingerprint.encode()})
+                    writer = pq.ParquetWriter(file, schema, compression='zstd')
+                writer.write_table(table.cast(schema))
+            if writer is not None:
+                writer.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+def ensure_columnar(source, cache_dir=CACHE_DIR):
+    """Path of the up-to-date Parquet copy of source, converting it if needed"""
+    path = cache_path(source, cache_dir)
+    if os.path.exists(path):
+        metadata = pq.read_schema(path).metadata or {}
+        if metadata.get(SOURCE_KEY) == source_fingerprint(source).encode():
+            return path
+    return convert_csv(source, cache_dir)
+
+
+def load_dataset(source, columns=None, cache_dir=CACHE_DIR):
+    """Read a CSV dataset through its columnar cache as a DataFrame"""
+    table = pq.read_table(ensure_columnar(source, cache_dir), columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def iter_dataset(source, chunksize=DEFAULT_CHUNKSIZE, columns=None, cache_dir=CACHE_DIR):
+    """Yield the dataset as DataFrames of at most chunksize rows"""
+    parquet = pq.ParquetFile(ensure_columnar(source, cache_dir), memory_map=True)
+    for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
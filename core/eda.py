@@ -0,0 +1,261 @@
+# core/eda.py
+import numpy as np
+import pandas as pd
+
+from core.dataset import DEFAULT_CHUNKSIZE, iter_dataset
+from core.features import TARGET_COLUMN
+
+# Distinct values kept per column before its value counts are binned
+MAX_DISTINCT = 10_000
+
+# Scatter plots: density bins per axis, coarser strata per axis, and points kept per stratum and class
+DENSITY_BINS = 100
+STRATA = 40
+POINTS_PER_STRATUM = 3
+
+LABELS = {
+    'sex': {0: 'Female', 1: 'Male'},
+    TARGET_COLUMN: {0: 'No Disease', 1: 'Heart Disease'},
+}
+
+
+def label_frame(frame):
+    """Copy of frame with sex and target mapped to display labels"""
+    frame = frame.copy()
+    for column, labels in LABELS.items():
+        if column in frame:
+            frame[column] = frame[column].map(labels)
+    return frame
+
+
+def weighted_quantile(values, counts, q):
+    """Quantile of sorted distinct values with counts, interpolated like pandas"""
+    cumulative = np.cumsum(counts)
+    position = (cumulative[-1] - 1) * q
+    lower = np.floor(position)
+    below = values[np.searchsorted(cumulative, lower, side='right')]
+    above = values[np.searchsorted(cumulative, lower + 1, side='right')] if lower + 1 < cumulative[-1] else below
+    return below + (position - lower) * (above - below)
+
+
+class StreamingSummary:
+    """One-pass, bounded-memory aggregates of a labelled dataset
+
+    Feed it chunks with update(). Per column and target class it keeps value
+    counts (binned once a column has more than max_distinct values), exact
+    minima and maxima and the sums and cross-products needed for the
+    correlation matrix. Memory depends on the number of distinct values,
+    never on the number of rows.
+    """
+
+    def __init__(self, max_distinct=MAX_DISTINCT):
+        self.max_distinct = max_distinct
+        self.columns = None
+        self.n_rows = 0
+        self.counts = {}
+        self.resolution = {}
+        self.minimum = {}
+        self.maximum = {}
+        self.sex_target = None
+        self._n_complete = 0
+        self._shift = None
+        self._sums = None
+        self._products = None
+
+    def update(self, chunk):
+        """Fold one chunk of rows into the aggregates"""
+        if self.columns is None:
+            if TARGET_COLUMN not in chunk.columns:
+                raise ValueError(f"Missing '{TARGET_COLUMN}' column")
+            self.columns = list(chunk.columns)
+            self._shift = chunk[self.columns].mean().fillna(0).to_numpy(dtype=np.float64)
+            self._sums = np.zeros(len(self.columns))
+            self._products = np.zeros((len(self.columns), len(self.columns)))
+        self.n_rows += len(chunk)
+
+        for column in self.columns:
+            self._count_column(column, chunk[column], chunk[TARGET_COLUMN])
+
+        crosstab = pd.crosstab(chunk['sex'], chunk[TARGET_COLUMN]) if 'sex' in chunk else None
+        if crosstab is not None:
+            self.sex_target = crosstab if self.sex_target is None else self.sex_target.add(crosstab, fill_value=0)
+
+        # Cross-products of shifted values keep the one-pass covariance numerically stable
+        complete = chunk[self.columns].dropna().to_numpy(dtype=np.float64) - self._shift
+        self._n_complete += len(complete)
+        self._sums += complete.sum(axis=0)
+        self._products += complete.T @ complete
+
+    def _count_column(self, column, values, target):
+        self.minimum[column] = min(self.minimum.get(column, np.inf), values.min())
+        self.maximum[column] = max(self.maximum.get(column, -np.inf), values.max())
+        resolution = self.resolution.get(column, 0)
+        if resolution:
+            values = self._bin(values, resolution)
+        counts = values.groupby([target.to_numpy(), values.to_numpy()]).size()
+        previous = self.counts.get(column)
+        counts = counts if previous is None else previous.add(counts, fill_value=0)
+        while counts.index.get_level_values(1).nunique() > self.max_distinct:
+            # Too many distinct values: merge counts into bins of doubling width
+            distinct = counts.index.get_level_values(1)
+            resolution = resolution * 2 or (self.maximum[column] - self.minimum[column]) * 2 / self.max_distinct
+            binned = self._bin(pd.Series(distinct, dtype=np.float64), resolution).to_numpy()
+            counts = counts.groupby([counts.index.get_level_values(0), binned]).sum()
+            self.resolution[column] = resolution
+        self.counts[column] = counts.astype(np.int64)
+
+    @staticmethod
+    def _bin(values, resolution):
+        return np.floor(values / resolution) * resolution + resolution / 2
+
+    def value_counts(self, column):
+        """Counts of each (binned) value of column, one column per target class"""
+        counts = self.counts[column].unstack(level=0, fill_value=0)
+        return counts.rename(columns=LABELS[TARGET_COLUMN]).sort_index()
+
+    def target_counts(self):
+        return self.value_counts(TARGET_COLUMN).sum().sort_values(ascending=False)
+
+    def crosstab(self):
+        """Sex by target counts, like pd.crosstab(df['sex'], df['target'])"""
+        return self.sex_target.astype(np.int64).rename(index=LABELS['sex'], columns=LABELS[TARGET_COLUMN])
+
+    def histogram(self, column, nbins=30):
+        """Bin edges and per-class counts; one bin per value when there are at most nbins values"""
+        counts = self.value_counts(column)
+        values = counts.index.to_numpy(dtype=np.float64)
+        if len(values) <= nbins:
+            width = np.diff(values).min() if len(values) > 1 else 1.0
+            edges = np.append(values - width / 2, values[-1] + width / 2)
+            return edges, counts.set_axis(range(len(values)))
+        edges = np.histogram_bin_edges(values, bins=nbins, range=(values[0], values[-1]))
+        binned = pd.DataFrame({
+            label: np.histogram(values, bins=edges, weights=counts[label])[0] for label in counts.columns
+        })
+        return edges, binned.astype(np.int64)
+
+    def describe(self, column):
+        """count, mean, std, min, quartiles and max, as DataFrame.describe() reports them"""
+        counts = self.value_counts(column).sum(axis=1)
+        values, weights = counts.index.to_numpy(dtype=np.float64), counts.to_numpy(dtype=np.float64)
+        return pd.Series(self._stats(values, weights) | {
+            'min': self.minimum[column], 'max': self.maximum[column]
+        }, name=column)[['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']]
+
+    @staticmethod
+    def _stats(values, weights):
+        n = weights.sum()
+        mean = (values * weights).sum() / n
+        std = np.sqrt((weights * (values - mean) ** 2).sum() / (n - 1)) if n > 1 else np.nan
+        stats = {'count': n, 'mean': mean, 'std': std}
+        for q in (0.25, 0.5, 0.75):
+            stats[f"{q:.0%}"] = weighted_quantile(values, weights, q)
+        return stats
+
+    def box_stats(self, column):
+        """Quartiles and 1.5 IQR whiskers of column for each target class"""
+        boxes = {}
+        for label, counts in self.value_counts(column).items():
+            counts = counts[counts > 0]
+            values, weights = counts.index.to_numpy(dtype=np.float64), counts.to_numpy(dtype=np.float64)
+            stats = self._stats(values, weights)
+            iqr = stats['75%'] - stats['25%']
+            boxes[label] = {
+                'q1': stats['25%'], 'median': stats['50%'], 'q3': stats['75%'], 'mean': stats['mean'],
+                'lowerfence': values[values >= stats['25%'] - 1.5 * iqr].min(),
+                'upperfence': values[values <= stats['75%'] + 1.5 * iqr].max(),
+            }
+        return boxes
+
+    def corr(self):
+        """Pearson correlation matrix over the rows with no missing values"""
+        n = self._n_complete
+        covariance = (self._products - np.outer(self._sums, self._sums) / n) / (n - 1)
+        scale = np.sqrt(np.diag(covariance))
+        return pd.DataFrame(covariance / np.outer(scale, scale), index=self.columns, columns=self.columns)
+
+
+class ScatterSummary:
+    """Bounded plotting data for one x/y scatter coloured by a 0/1 column
+
+    Keeps per-class 2-D counts on the x_edges/y_edges grid for a density
+    view, and a point sample stratified over a coarser strata x strata grid:
+    each stratum keeps up to per_stratum random points per class, so
+    sparse regions and outliers are always drawn while dense regions are
+    thinned. Both sizes are fixed by the grids, whatever the row count.
+    """
+
+    def __init__(self, x, y, color, x_edges, y_edges, strata=STRATA, per_stratum=POINTS_PER_STRATUM,
+                 hover=('age',), seed=0):
+        self.x, self.y, self.color = x, y, color
+        self.x_edges, self.y_edges = np.asarray(x_edges), np.asarray(y_edges)
+        self.strata = strata
+        self.per_stratum = per_stratum
+        self.columns = list(dict.fromkeys([x, y, color, *hover]))
+        self.rng = np.random.default_rng(seed)
+        self.n_rows = 0
+        self.counts = {}
+        self.points = None
+        self._keys = None
+
+    def _cells(self, values, edges, n_cells):
+        position = (values.to_numpy(dtype=np.float64) - edges[0]) / (edges[-1] - edges[0]) * n_cells
+        return np.clip(position.astype(np.int64), 0, n_cells - 1)
+
+    def update(self, chunk):
+        chunk = chunk[self.columns].dropna()
+        self.n_rows += len(chunk)
+        classes = chunk[self.color].to_numpy()
+        for value in np.unique(classes):
+            mask = classes == value
+            counts, _, _ = np.histogram2d(chunk[self.x][mask], chunk[self.y][mask],
+                                          bins=[self.x_edges, self.y_edges])
+            self.counts[value] = self.counts.get(value, 0) + counts.astype(np.int64)
+
+        strata = pd.DataFrame({
+            'class': classes,
+            'sx': self._cells(chunk[self.x], self.x_edges, self.strata),
+            'sy': self._cells(chunk[self.y], self.y_edges, self.strata),
+            'key': self.rng.random(len(chunk)),
+        })
+        points = chunk.reset_index(drop=True)
+        if self.points is not None:
+            points = pd.concat([self.points, points], ignore_index=True)
+            strata = pd.concat([self._keys, strata], ignore_index=True)
+        # Smallest random keys per stratum and class: a uniform draw within each stratum
+        strata = strata.sort_values('key')
+        keep = strata.index[strata.groupby(['class', 'sx', 'sy']).cumcount() < self.per_stratum]
+        self.points = points.loc[keep].reset_index(drop=True)
+        self._keys = strata.loc[keep].reset_index(drop=True)
+
+    def labelled_points(self):
+        return label_frame(self.points)
+
+    def density(self):
+        """(label, counts with y along rows) per class for a heatmap"""
+        labels = LABELS.get(self.color, {})
+        return [(labels.get(value, value), counts.T) for value, counts in sorted(self.counts.items())]
+
+
+def summarize_csv(source, chunksize=DEFAULT_CHUNKSIZE, **kwargs):
+    """Aggregate a CSV of any size in one pass of chunksize rows"""
+    summary = StreamingSummary(**kwargs)
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        summary.update(chunk)
+    return summary
+
+
+def summarize_dataset(source, chunksize=DEFAULT_CHUNKSIZE, **kwargs):
+    """Like summarize_csv, reading through the columnar dataset cache"""
+    summary = StreamingSummary(**kwargs)
+    for chunk in iter_dataset(source, chunksize=chunksize):
+        summary.update(chunk)
+    return summary
+
+
+def summarize_scatter(source, x, y, color, x_edges, y_edges, chunksize=DEFAULT_CHUNKSIZE, **kwargs):
+    """ScatterSummary over the dataset, reading only the plotted columns"""
+    scatter = ScatterSummary(x, y, color, x_edges, y_edges, **kwargs)
+    for chunk in iter_dataset(source, chunksize=chunksize, columns=scatter.columns):
+        scatter.update(chunk)
+    return scatter
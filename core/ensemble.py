@@ -0,0 +1,94 @@
+# core/ensemble.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import numpy as np
+
+from core.batch import predict_matrix
+
+
+def _timed_predict(model, X, model_name):
+    start = time.perf_counter()
+    result = predict_matrix(model, X, model_name)
+    return result, time.perf_counter() - start
+
+
+class EnsembleExecutor:
+    """Score several models at the same time on a shared thread pool
+
+    sklearn and NumPy release the GIL in their numeric kernels, so the
+    wall time of run() approaches that of the slowest model instead of
+    the sum. Each model gets `timeout` seconds from dispatch; a model that
+    misses it is reported as failed. Its thread finishes in the background,
+    so the pool has headroom and is replaced by a fresh one when a timed-out
+    model is still running; later calls never queue behind it.
+    """
+
+    def __init__(self, models, max_workers=None, timeout=None):
+        self.models = models
+        self.timeout = timeout
+        self.max_workers = max_workers or 2 * len(models)
+        self.closed = False
+        self._lock = threading.Lock()
+        self._pool = self._new_pool()
+
+    def _new_pool(self):
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ensemble')
+
+    def run(self, X, model_names=None):
+        """Score X with every model (or model_names) concurrently
+
+        Returns (results, timings, failures): results maps a model name to
+        its (predictions, probabilities, confidences) arrays, timings to
+        the model's own scoring time in seconds and failures to an error
+        message for models that raised or timed out.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        model_names = model_names or list(self.models)
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("EnsembleExecutor is closed")
+            pool = self._pool
+            futures = {
+                name: pool.submit(_timed_predict, self.models[name], X, name)
+                for name in model_names
+            }
+        wait(futures.values(), timeout=self.timeout)
+
+        results, timings, failures = {}, {}, {}
+        stuck = False
+        for name, future in futures.items():
+            if not future.done():
+                # A queued call is dropped; a running one keeps its thread until it returns
+                stuck |= not future.cancel()
+                failures[name] = f"Timed out after {self.timeout:g}s"
+            elif future.exception() is not None:
+                failures[name] = str(future.exception())
+            else:
+                results[name], timings[name] = future.result()
+        if stuck:
+            self._replace_pool(pool)
+        return results, timings, failures
+
+    def _replace_pool(self, pool):
+        """Leave pool to its stuck threads and give later calls a fresh one"""
+        with self._lock:
+            if self._pool is pool and not self.closed:
+                self._pool = self._new_pool()
+                pool.shutdown(wait=False)
+
+    def run_single(self, features, model_names=None):
+        """Score one patient; results map to (prediction, probability, confidence) scalars"""
+        results, timings, failures = self.run(np.asarray([features]), model_names)
+        singles = {
+            name: (predictions[0], probabilities[0], confidences[0])
+            for name, (predictions, probabilities, confidences) in results.items()
+        }
+        return singles, timings, failures
+
+    def close(self):
+        """Stop accepting work; calls already running finish in the background"""
+        with self._lock:
+            self.closed = True
+            self._pool.shutdown(wait=False)
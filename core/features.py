@@ -0,0 +1,115 @@
+# core/features.py
+
+# Column order the models were trained on (matches heart-disease.csv)
+FEATURE_COLUMNS = [
+    'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg',
+    'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'
+]
+
+TARGET_COLUMN = 'target'
+
+# Every input feature: what it means, how the Predictor form asks for it and what a valid value is.
+# Coded features accept only their codes; the others accept dtype values within [min, max].
+# Ranges and codes cover every value in heart-disease.csv, which the models were trained on.
+# typical is the range seen in heart-disease.csv, shown on the Data Information page.
+FEATURE_SCHEMA = {
+    'age': {
+        'label': "**Age**", 'description': 'Age of the patient',
+        'impact': 'Older age is generally associated with higher risk of heart disease',
+        'help': "Age of the patient in years",
+        'dtype': 'int', 'min': 20, 'max': 100, 'default': 50, 'unit': 'years', 'typical': (29, 77),
+    },
+    'sex': {
+        'label': "**Gender**", 'description': 'Biological sex of the patient',
+        'impact': 'Gender can influence heart disease risk patterns',
+        'help': "0 = Female, 1 = Male",
+        'dtype': 'int', 'codes': {0: "Female", 1: "Male"}, 'default': 0,
+    },
+    'cp': {
+        'label': "**Chest Pain Type**", 'description': 'Chest pain type',
+        'impact': 'Different types of chest pain indicate varying levels of cardiac risk',
+        'help': "Type of chest pain experienced",
+        'dtype': 'int', 'default': 0,
+        'codes': {0: "Typical Angina", 1: "Atypical Angina", 2: "Non-anginal Pain", 3: "Asymptomatic"},
+    },
+    'trestbps': {
+        'label': "**Resting Blood Pressure** (mm Hg)", 'description': 'Resting blood pressure',
+        'impact': 'Higher blood pressure increases strain on the heart',
+        'help': "Resting blood pressure measurement",
+        'dtype': 'int', 'min': 90, 'max': 200, 'default': 120, 'unit': 'mm Hg', 'typical': (94, 200),
+    },
+    'chol': {
+        'label': "**Cholesterol Level** (mg/dl)", 'description': 'Serum cholesterol level',
+        'impact': 'High cholesterol can lead to artery blockage and heart disease',
+        'help': "Serum cholesterol level",
+        'dtype': 'int', 'min': 100, 'max': 600, 'default': 250, 'unit': 'mg/dl', 'typical': (126, 564),
+    },
+    'fbs': {
+        'label': "**Fasting Blood Sugar** > 120 mg/dl", 'description': 'Fasting blood sugar',
+        'impact': 'High blood sugar is associated with diabetes and increased heart disease risk',
+        'help': "Fasting blood sugar level",
+        'dtype': 'int', 'codes': {0: "No (≤120 mg/dl)", 1: "Yes (>120 mg/dl)"}, 'default': 0,
+    },
+    'restecg': {
+        'label': "**Resting ECG Results**", 'description': 'Resting electrocardiographic results',
+        'impact': 'Abnormal ECG patterns can indicate heart problems',
+        'help': "Resting electrocardiographic results",
+        'dtype': 'int', 'default': 0,
+        'codes': {0: "Normal", 1: "ST-T Wave Abnormality", 2: "Left Ventricular Hypertrophy"},
+    },
+    'thalach': {
+        'label': "**Max Heart Rate Achieved**", 'description': 'Maximum heart rate achieved',
+        'impact': 'Lower maximum heart rate may indicate reduced cardiac capacity',
+        'help': "Maximum heart rate during exercise",
+        'dtype': 'int', 'min': 70, 'max': 220, 'default': 150, 'unit': 'bpm', 'typical': (71, 202),
+    },
+    'exang': {
+        'label': "**Exercise-Induced Angina**", 'description': 'Exercise induced angina',
+        'impact': 'Chest pain during exercise is a strong indicator of heart disease',
+        'help': "Chest pain during exercise",
+        'dtype': 'int', 'codes': {0: "No", 1: "Yes"}, 'default': 0,
+    },
+    'oldpeak': {
+        'label': "**ST Depression** (Oldpeak)", 'description': 'ST depression induced by exercise relative to rest',
+        'impact': 'Higher values indicate more significant ECG changes during stress',
+        'help': "ST depression induced by exercise",
+        'dtype': 'float', 'min': 0.0, 'max': 6.2, 'step': 0.1, 'default': 1.0, 'typical': (0.0, 6.2),
+    },
+    'slope': {
+        'label': "**Slope of ST Segment**", 'description': 'Slope of the peak exercise ST segment',
+        'impact': 'Specific slope patterns can indicate coronary artery disease',
+        'help': "Slope of peak exercise ST segment",
+        'dtype': 'int', 'codes': {0: "Upsloping", 1: "Flat", 2: "Downsloping"}, 'default': 0,
+    },
+    'ca': {
+        'label': "**Number of Major Vessels**", 'description': 'Number of major vessels colored by fluoroscopy',
+        'impact': 'More blocked vessels indicate more severe coronary artery disease',
+        'help': "Number of major vessels colored by fluoroscopy (0-4)",
+        'dtype': 'int', 'min': 0, 'max': 4, 'default': 1, 'unit': 'vessels', 'typical': (0, 4),
+    },
+    'thal': {
+        'label': "**Thalassemia Result**", 'description': 'Thalassemia (blood disorder) measurement',
+        'impact': 'Specific patterns can indicate blood flow issues to the heart',
+        'help': "Thalassemia test results",
+        'dtype': 'int', 'default': 1,
+        'codes': {0: "Not Recorded", 1: "Normal", 2: "Fixed Defect", 3: "Reversible Defect"},
+    },
+}
+
+
+def feature_values(feature):
+    """Every value the Predictor form allows for a feature"""
+    spec = FEATURE_SCHEMA[feature]
+    if 'codes' in spec:
+        return list(spec['codes'])
+    if spec['dtype'] == 'int':
+        return list(range(spec['min'], spec['max'] + 1))
+    steps = round((spec['max'] - spec['min']) / spec['step'])
+    return [round(spec['min'] + spec['step'] * step, 1) for step in range(steps + 1)]
+
+
+# Values reachable through the Predictor form controls
+FORM_VALUES = {feature: feature_values(feature) for feature in FEATURE_COLUMNS}
+
+# Initial values of the Predictor form controls
+FORM_DEFAULTS = {feature: FEATURE_SCHEMA[feature]['default'] for feature in FEATURE_COLUMNS}
@@ -0,0 +1,143 @@
+# core/forest.py
+import numpy as np
+
+# Upper bound on rows x trees evaluated at once, to keep the node index matrix small
+CHUNK_CELLS = 1 << 16
+
+# Batches at least this large go to the wrapped sklearn forest: the lock-step NumPy walk
+# wins on single rows and small batches, sklearn's compiled walk beyond about this size
+SKLEARN_MIN_ROWS = 2_000
+
+
+class FlatForest:
+    """A fitted Random Forest flattened into contiguous NumPy node arrays
+
+    Nodes of every tree are concatenated, so children[i] holds the global
+    (left, right) node indices of node i and roots[t] is the first node of
+    tree t. Leaves point to themselves with an infinite threshold, which
+    lets every row walk all trees in lock-step for max_depth levels
+    without masking.
+
+    from_sklearn keeps the original forest as fallback, which scores (and
+    applies) batches of SKLEARN_MIN_ROWS or more; a FlatForest loaded from arrays
+    has no fallback and always walks the arrays.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes, max_depth, fallback=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.fallback = fallback
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Export a fitted RandomForestClassifier into flat arrays"""
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            children.append(np.column_stack([
+                np.where(is_leaf, nodes, tree.children_left),
+                np.where(is_leaf, nodes, tree.children_right),
+            ]) + offset)
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :]
+            values.append(value / value.sum(axis=1, keepdims=True))
+
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children).astype(np.int32),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.array(roots, dtype=np.int32),
+            classes=np.asarray(forest.classes_),
+            max_depth=max_depth,
+            fallback=forest,
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.feature, self.threshold, self.children,
+                                              self.value, self.roots))
+
+    def to_arrays(self):
+        """(arrays, params) for the artifact format"""
+        arrays = {
+            'feature': self.feature, 'threshold': self.threshold, 'children': self.children,
+            'value': self.value, 'roots': self.roots, 'classes': self.classes_,
+        }
+        return arrays, {'max_depth': self.max_depth}
+
+    @classmethod
+    def from_arrays(cls, arrays, params):
+        return cls(classes=arrays['classes'], max_depth=params['max_depth'],
+                   **{key: arrays[key] for key in ('feature', 'threshold', 'children', 'value', 'roots')})
+
+    def save(self, path):
+        """Write the node arrays to a single .npz file"""
+        np.savez(
+            path, feature=self.feature, threshold=self.threshold, children=self.children,
+            value=self.value, roots=self.roots, classes=self.classes_,
+            max_depth=self.max_depth
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(**{key: data[key] for key in data.files})
+
+    def apply(self, X):
+        """Return the leaf index reached in every tree, shape (n_rows, n_trees)"""
+        # Trees compare float32 features against float64 thresholds, as sklearn does
+        X = np.asarray(X, dtype=np.float32)
+        if self.fallback is not None and len(X) >= SKLEARN_MIN_ROWS:
+            # Each tree's compiled walk, called directly to skip the forest's per-tree joblib overhead.
+            # sklearn numbers every tree's nodes in the same order, so only the tree offsets differ.
+            X = np.ascontiguousarray(X)
+            node = np.empty((len(X), self.n_trees), dtype=np.int32)
+            for tree, (estimator, root) in enumerate(zip(self.fallback.estimators_, self.roots)):
+                node[:, tree] = estimator.tree_.apply(X) + root
+            return node
+        flat_X = X.ravel()
+        flat_children = self.children.ravel()
+        row_offsets = (np.arange(len(X), dtype=np.int32) * X.shape[1])[:, np.newaxis]
+
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            goes_right = flat_X[row_offsets + self.feature[node]] > self.threshold[node]
+            node = flat_children[2 * node + goes_right]
+        return node
+
+    def predict_proba(self, X):
+        """Average the leaf class distributions over all trees, in row chunks"""
+        X = np.asarray(X)
+        if self.fallback is not None and len(X) >= SKLEARN_MIN_ROWS:
+            return self.fallback.predict_proba(X)
+        proba = np.empty((len(X), len(self.classes_)))
+        chunk = max(1, CHUNK_CELLS // self.n_trees)
+        for start in range(0, len(X), chunk):
+            leaves = self.apply(X[start:start + chunk])
+            for k in range(len(self.classes_)):
+                proba[start:start + chunk, k] = self.value[:, k][leaves].mean(axis=1)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
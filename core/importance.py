@@ -0,0 +1,175 @@
+# core/importance.py
+"""Global feature importance of the served models, measured on a labelled dataset
+
+Permutation importance is the drop in ROC-AUC when one feature's column is
+shuffled, repeated with different shuffles for a confidence interval. The
+(feature, model) tasks run on a process pool; the prepared matrix is
+written once as .npy and memory-mapped by every worker. A worker permutes
+one column into a reused buffer and scores it in row blocks, so it never
+holds a full copy of the matrix.
+For the Random Forest, impurity importance comes with an interval from
+the spread of the per-tree importances.
+
+Results are cached as JSON keyed by model version and dataset hash.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+
+from core.batch import to_matrix
+from core.dataset import CACHE_DIR, load_dataset
+from core.features import FEATURE_COLUMNS, TARGET_COLUMN
+from core.models import DATA_DIR, load_model_files
+from core.registry import data_dir_label
+
+DEFAULT_REPEATS = 10
+CONFIDENCE = 0.95
+
+# Rows per block when scoring with one column permuted
+SCRATCH_ROWS = 65_536
+
+# Models, matrix and labels held by each pool worker (or in-process with workers=1)
+_worker = {}
+
+
+def dataset_hash(source, block_size=1 << 20):
+    """SHA-256 of the file contents, so a touched but unchanged file keeps its cache"""
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_file(version, data_hash, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, 'importance', f"{version}-{data_hash[:16]}.json")
+
+
+def confidence_interval(samples, confidence=CONFIDENCE):
+    """Mean, standard deviation and Student-t interval of the mean"""
+    samples = np.asarray(samples, dtype=np.float64)
+    mean = samples.mean()
+    if len(samples) < 2:
+        return mean, 0.0, mean, mean
+    std = samples.std(ddof=1)
+    half = stats.t.ppf((1 + confidence) / 2, len(samples) - 1) * std / np.sqrt(len(samples))
+    return mean, std, mean - half, mean + half
+
+
+def _init_worker(models, matrix_path, y):
+    X = np.load(matrix_path, mmap_mode='r')
+    _worker.update(models=models, X=X, y=y, permuted=np.empty(len(X)), positive=np.empty(len(X)),
+                   scratch=np.empty((min(len(X), SCRATCH_ROWS), X.shape[1])))
+
+
+def _score_permuted(model, column):
+    """Class-1 probabilities of the worker's matrix with column replaced by the permuted buffer"""
+    X, permuted, positive, scratch = _worker['X'], _worker['permuted'], _worker['positive'], _worker['scratch']
+    for start in range(0, len(X), len(scratch)):
+        block = scratch[:min(len(scratch), len(X) - start)]
+        block[:] = X[start:start + len(block)]
+        block[:, column] = permuted[start:start + len(block)]
+        positive[start:start + len(block)] = model.predict_proba(block)[:, 1]
+    return positive
+
+
+def _permutation_scores(model_name, column, repeats, seed):
+    """ROC-AUC of model_name with column shuffled, once per repeat"""
+    model = _worker['models'][model_name]
+    X, y, permuted = _worker['X'], _worker['y'], _worker['permuted']
+    rng = np.random.default_rng([seed, column])
+    scores = []
+    for _ in range(repeats):
+        np.take(X[:, column], rng.permutation(len(X)), out=permuted)
+        scores.append(roc_auc_score(y, _score_permuted(model, column)))
+    return model_name, column, scores
+
+
+def permutation_importance(models, X, y, repeats=DEFAULT_REPEATS, workers=None, seed=0):
+    """Rows of (model, feature, importance, std, ci_low, ci_high) plus each model's baseline ROC-AUC"""
+    workers = workers or os.cpu_count() or 1
+    baselines = {model_name: roc_auc_score(y, model.predict_proba(X)[:, 1]) for model_name, model in models.items()}
+    tasks = [(model_name, column, repeats, seed) for model_name in models for column in range(X.shape[1])]
+    with tempfile.TemporaryDirectory() as tmp:
+        matrix_path = os.path.join(tmp, 'X.npy')
+        np.save(matrix_path, np.ascontiguousarray(X, dtype=np.float64))
+        if workers == 1:
+            _init_worker(models, matrix_path, y)
+            results = [_permutation_scores(*task) for task in tasks]
+            _worker.clear()
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(models, matrix_path, y)) as pool:
+                results = list(pool.map(_permutation_scores, *zip(*tasks)))
+
+    rows = []
+    for model_name, column, scores in results:
+        drops = baselines[model_name] - np.asarray(scores)
+        mean, std, low, high = confidence_interval(drops)
+        rows.append({'model': model_name, 'method': 'permutation', 'feature': FEATURE_COLUMNS[column],
+                     'importance': mean, 'std': std, 'ci_low': low, 'ci_high': high})
+    return rows, baselines
+
+
+def impurity_importance(model_name, forest):
+    """Mean decrease in impurity per feature, with an interval over the trees"""
+    per_tree = np.array([tree.feature_importances_ for tree in forest.estimators_])
+    rows = []
+    for column, feature in enumerate(FEATURE_COLUMNS):
+        mean, std, low, high = confidence_interval(per_tree[:, column])
+        rows.append({'model': model_name, 'method': 'impurity', 'feature': feature,
+                     'importance': mean, 'std': std, 'ci_low': low, 'ci_high': high})
+    return rows
+
+
+def compute_importance(source, data_dir=DATA_DIR, repeats=DEFAULT_REPEATS, workers=None, seed=0,
+                       cache_dir=CACHE_DIR):
+    """Measure every model on a labelled dataset and write the result to the cache"""
+    start = time.perf_counter()
+    version, data_hash = data_dir_label(data_dir), dataset_hash(source)
+    models = load_model_files(data_dir)
+    data = load_dataset(source, columns=FEATURE_COLUMNS + [TARGET_COLUMN], cache_dir=cache_dir)
+    X, y = to_matrix(data), data[TARGET_COLUMN].to_numpy()
+
+    rows, baselines = permutation_importance(models, X, y, repeats=repeats, workers=workers, seed=seed)
+    for model_name, model in models.items():
+        if isinstance(model, RandomForestClassifier):
+            rows += impurity_importance(model_name, model)
+
+    report = {
+        'model_version': version, 'dataset': os.path.basename(source), 'dataset_hash': data_hash,
+        'n_rows': len(X), 'repeats': repeats, 'confidence': CONFIDENCE, 'metric': 'roc_auc',
+        'baseline': baselines, 'seconds': time.perf_counter() - start, 'rows': rows,
+    }
+    path = cache_file(version, data_hash, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, path)
+    return report
+
+
+def load_importance(source, data_dir=DATA_DIR, cache_dir=CACHE_DIR, data_hash=None):
+    """The cached report for the current models and dataset, or None if it has not been computed
+
+    data_hash skips hashing the dataset when the caller already knows it.
+    """
+    path = cache_file(data_dir_label(data_dir), data_hash or dataset_hash(source), cache_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def importance_frame(report):
+    return pd.DataFrame(report['rows'])
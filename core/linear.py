@@ -0,0 +1,52 @@
+# core/linear.py
+import numpy as np
+from scipy.special import expit
+
+
+class FastLogistic:
+    """Closed-form scorer for a fitted binary LogisticRegression
+
+    Pulls coef_ and intercept_ out of the sklearn model once and applies
+    the same dot product and sigmoid as LogisticRegression.predict_proba,
+    without sklearn's per-call validation and dispatch.
+    """
+
+    def __init__(self, coef, intercept, classes):
+        coef = np.asarray(coef, dtype=np.float64)
+        if coef.ndim != 2 or coef.shape[0] != 1 or len(classes) != 2:
+            raise ValueError("FastLogistic only supports binary logistic regression")
+        # Same (n_features, 1) layout sklearn multiplies by, so results match bit for bit
+        self.coef_T = np.ascontiguousarray(coef.T)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.n_features = coef.shape[1]
+
+    @classmethod
+    def from_sklearn(cls, model):
+        return cls(model.coef_, model.intercept_, model.classes_)
+
+    def to_arrays(self):
+        """(arrays, params) for the artifact format"""
+        return {'coef': self.coef_T.T, 'intercept': self.intercept, 'classes': self.classes_}, {}
+
+    @classmethod
+    def from_arrays(cls, arrays, params):
+        return cls(arrays['coef'], arrays['intercept'], arrays['classes'])
+
+    @property
+    def nbytes(self):
+        return self.coef_T.nbytes + self.intercept.nbytes
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        scores = X @ self.coef_T
+        scores += self.intercept
+        positive = expit(scores, out=scores).ravel()
+
+        proba = np.empty((len(positive), 2))
+        np.subtract(1, positive, out=proba[:, 0])
+        proba[:, 1] = positive
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -0,0 +1,169 @@
+# core/lookup.py
+"""Precomputed risk table over (a subset of) the Predictor's discrete input grid
+
+Each grid cell is addressed by a mixed-radix index over the per-feature
+value lists, so a lookup is a few searchsorted calls and one array read.
+grid.json records the model_signature of every model a table was built
+from; TableModel refuses a table built for any other model version.
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+from core.features import FEATURE_COLUMNS, FORM_DEFAULTS, FORM_VALUES
+from core.models import DATA_DIR, model_signature
+
+GRID_NAME = 'grid.json'
+ROWS_PER_CHUNK = 1 << 16
+
+# Heavily used subset: every categorical code, age in 5-year steps and the
+# form defaults for the other continuous measurements
+DEFAULT_GRID = {
+    feature: values if len(values) <= 5 else [FORM_DEFAULTS[feature]]
+    for feature, values in FORM_VALUES.items()
+}
+DEFAULT_GRID['age'] = list(range(20, 101, 5))
+
+
+def table_filename(model_name):
+    return model_name.lower().replace('-', '_').replace(' ', '_') + '.npy'
+
+
+class GridIndex:
+    """Mixed-radix addressing of a feature grid given as {feature: values}"""
+
+    def __init__(self, grid):
+        self.grid = {feature: sorted(grid[feature]) for feature in FEATURE_COLUMNS}
+        self.values = [np.asarray(self.grid[feature], dtype=np.float64) for feature in FEATURE_COLUMNS]
+        self.radices = np.array([len(values) for values in self.values], dtype=np.int64)
+        # Last feature varies fastest
+        self.strides = np.concatenate([np.cumprod(self.radices[::-1])[::-1][1:], [1]])
+        self.size = int(np.prod(self.radices))
+
+    def encode(self, X):
+        """Return (cell index, on-grid mask) for every row of X"""
+        X = np.asarray(X, dtype=np.float64)
+        index = np.zeros(len(X), dtype=np.int64)
+        on_grid = np.ones(len(X), dtype=bool)
+        for column, (values, stride) in enumerate(zip(self.values, self.strides)):
+            position = np.clip(np.searchsorted(values, X[:, column]), 0, len(values) - 1)
+            on_grid &= np.abs(values[position] - X[:, column]) < 1e-9
+            index += position * stride
+        return index, on_grid
+
+    def decode(self, index):
+        """Feature rows for an array of cell indices"""
+        index = np.asarray(index, dtype=np.int64)
+        X = np.empty((len(index), len(FEATURE_COLUMNS)))
+        for column, (values, stride, radix) in enumerate(zip(self.values, self.strides, self.radices)):
+            X[:, column] = values[(index // stride) % radix]
+        return X
+
+
+def build_tables(models, out_dir, grid=None, dtype=np.float32, data_dir=DATA_DIR):
+    """Pre-score every grid cell with every model into memory-mapped .npy files
+
+    models must be the versions currently served from data_dir, whose
+    signatures are recorded with the tables. Returns {model name:
+    {'cells', 'bytes', 'seconds'}}.
+    """
+    index = GridIndex(grid or DEFAULT_GRID)
+    os.makedirs(out_dir, exist_ok=True)
+    report = {}
+    for model_name, model in models.items():
+        path = os.path.join(out_dir, table_filename(model_name))
+        start = time.perf_counter()
+        table = np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=dtype, shape=(index.size,))
+        for first in range(0, index.size, ROWS_PER_CHUNK):
+            cells = np.arange(first, min(first + ROWS_PER_CHUNK, index.size))
+            table[cells] = model.predict_proba(index.decode(cells))[:, 1]
+        table.flush()
+        del table
+        os.replace(path + '.tmp', path)
+        report[model_name] = {
+            'cells': index.size,
+            'bytes': os.path.getsize(path),
+            'seconds': time.perf_counter() - start,
+        }
+
+    with open(os.path.join(out_dir, GRID_NAME), 'w') as file:
+        json.dump({
+            'grid': index.grid, 'models': list(models),
+            'signatures': {model_name: model_signature(model_name, data_dir) for model_name in models},
+        }, file)
+    return report
+
+
+class LookupTable:
+    """Memory-mapped risk tables written by build_tables"""
+
+    def __init__(self, out_dir):
+        with open(os.path.join(out_dir, GRID_NAME)) as file:
+            spec = json.load(file)
+        self.index = GridIndex(spec['grid'])
+        # Tables built before signatures were recorded match no model version
+        self.signatures = spec.get('signatures', {})
+        self.tables = {
+            model_name: np.load(os.path.join(out_dir, table_filename(model_name)), mmap_mode='r')
+            for model_name in spec['models']
+        }
+
+    @property
+    def nbytes(self):
+        return sum(table.nbytes for table in self.tables.values())
+
+    def lookup(self, model_name, X):
+        """Return (heart disease probability, on-grid mask); off-grid rows are NaN"""
+        cells, on_grid = self.index.encode(X)
+        probabilities = np.full(len(cells), np.nan)
+        probabilities[on_grid] = self.tables[model_name][cells[on_grid]]
+        return probabilities, on_grid
+
+    def verify(self, models, n_samples=10_000, seed=0):
+        """Compare table answers with live predict_proba on random grid cells"""
+        rng = np.random.default_rng(seed)
+        cells = rng.integers(0, self.index.size, n_samples)
+        X = self.index.decode(cells)
+        report = {}
+        for model_name, model in models.items():
+            live = model.predict_proba(X)[:, 1]
+            table = self.tables[model_name][cells].astype(np.float64)
+            report[model_name] = {
+                'max_abs_diff': float(np.abs(live - table).max()),
+                'label_agreement': float(np.mean((live > 0.5) == (table > 0.5))),
+            }
+        return report
+
+
+class TableModel:
+    """Model wrapper answering on-grid rows from a LookupTable and the rest live
+
+    signature is the model_signature of model; a table built from any other
+    version raises ValueError rather than serve that version's answers.
+    """
+
+    def __init__(self, table, model_name, model, signature):
+        built = table.signatures.get(model_name)
+        if built != signature:
+            raise ValueError(f"The {model_name} lookup table was built for model version {built}, "
+                             f"not the served {signature}; rebuild it with scripts/build_lookup.py")
+        self.table = table
+        self.model_name = model_name
+        self.model = model
+        self.classes_ = model.classes_
+        self.hits = 0
+        self.fallbacks = 0
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        positive, on_grid = self.table.lookup(self.model_name, X)
+        if not on_grid.all():
+            positive[~on_grid] = self.model.predict_proba(X[~on_grid])[:, 1]
+        self.hits += int(on_grid.sum())
+        self.fallbacks += int(len(X) - on_grid.sum())
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -0,0 +1,197 @@
+# core/metrics.py
+"""Process-wide prediction counters and latency histograms
+
+Metrics are keyed by name and labels and rendered in the Prometheus text
+exposition format. The inference server exposes them at GET /metrics; the
+Streamlit app can serve them on a local port with serve_metrics().
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds, from 50 µs single-row calls to multi-second batches
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DESCRIPTIONS = {
+    'hfp_prediction_stage_seconds': "Time per prediction stage: build_input, predict_proba, predict, explain",
+    'hfp_predictions_total': "predict_matrix calls per model",
+    'hfp_rows_scored_total': "Rows scored per model",
+    'hfp_prediction_errors_total': "Prediction calls that raised, per model",
+    'hfp_cache_requests_total': "Prediction cache lookups per model and result (hit, disk_hit, miss)",
+    'hfp_http_request_seconds': "Inference server request latency per route",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Histogram:
+    """Bucketed observations with a running count and sum"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding quantile q (the last finite bound if beyond)"""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+class Metrics:
+    """Thread-safe registry of counters and histograms"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _label_key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            key = _label_key(labels)
+            if key not in series:
+                series[key] = Histogram(self.buckets)
+            series[key].observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the wall time of the block, whether or not it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def drain(self):
+        """Return the raw state and reset it, so another process can merge() it"""
+        with self._lock:
+            state = (self._counters, self._histograms)
+            self._counters, self._histograms = {}, {}
+        return state
+
+    def merge(self, state):
+        """Add the counts from another registry's drain()"""
+        counters, histograms = state
+        with self._lock:
+            for name, series in counters.items():
+                mine = self._counters.setdefault(name, {})
+                for key, value in series.items():
+                    mine[key] = mine.get(key, 0) + value
+            for name, series in histograms.items():
+                mine = self._histograms.setdefault(name, {})
+                for key, histogram in series.items():
+                    target = mine.setdefault(key, Histogram(self.buckets))
+                    target.counts = [a + b for a, b in zip(target.counts, histogram.counts)]
+                    target.count += histogram.count
+                    target.sum += histogram.sum
+
+    def snapshot(self):
+        """Counter and histogram rows (labels plus values) for display"""
+        with self._lock:
+            counters = [
+                dict(key) | {'metric': name, 'value': value}
+                for name, series in self._counters.items()
+                for key, value in series.items()
+            ]
+            histograms = [
+                dict(key) | {
+                    'metric': name, 'count': histogram.count,
+                    'total_ms': histogram.sum * 1000,
+                    'mean_ms': histogram.sum / histogram.count * 1000,
+                    'p50_ms': histogram.quantile(0.5) * 1000,
+                    'p90_ms': histogram.quantile(0.9) * 1000,
+                    'p99_ms': histogram.quantile(0.99) * 1000,
+                }
+                for name, series in self._histograms.items()
+                for key, histogram in series.items()
+            ]
+        return counters, histograms
+
+    def render(self):
+        """Everything in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {DESCRIPTIONS.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum!r}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by every caller in the process
+METRICS = Metrics()
+
+
+def serve_metrics(port, host='127.0.0.1', metrics=METRICS):
+    """Serve metrics.render() at http://host:port/metrics from a daemon thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
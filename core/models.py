@@ -0,0 +1,148 @@
+# core/models.py
+import json
+import os
+import pickle
+import time
+from functools import partial
+
+from core.compact import CompactForest
+from core.forest import FlatForest
+from core.linear import FastLogistic
+from core.neighbors import IndexedKNN
+
+DATA_DIR = 'Data'
+
+# Versioned models live in DATA_DIR/versions/<version>/; CURRENT names the published one.
+# Without a CURRENT file the pickles directly inside DATA_DIR are served.
+VERSIONS_DIR = 'versions'
+CURRENT_FILE = 'CURRENT'
+METADATA_FILE = 'metadata.json'
+
+# Display name -> pickled model file inside DATA_DIR
+MODEL_FILES = {
+    'Logistic Regression': 'logistic_regression_model.pkl',
+    'Random Forest': 'random_forest_model.pkl',
+    'K-Nearest Neighbors': 'knn_model.pkl',
+}
+
+# Alternative inference engines: display name -> engine name -> builder taking the sklearn model
+ENGINES = {
+    'Logistic Regression': {'closed_form': FastLogistic.from_sklearn},
+    'Random Forest': {
+        'flat': FlatForest.from_sklearn,
+        # All trees, 8-bit leaf rates, float32 thresholds; see scripts/compact_forest.py for smaller variants
+        'compact': CompactForest.from_sklearn,
+    },
+    'K-Nearest Neighbors': {
+        'kd_tree': IndexedKNN.from_sklearn,
+        'ball_tree': partial(IndexedKNN.from_sklearn, index='ball_tree'),
+        'brute': partial(IndexedKNN.from_sklearn, index='brute'),
+        # Standardised feature space: different neighbourhoods than the pickled model
+        'kd_tree_scaled': partial(IndexedKNN.from_sklearn, scale=True),
+    },
+}
+
+# Fastest engine per model that gives the pickled model's predictions; the inference server's default
+FAST_ENGINES = {
+    'Logistic Regression': 'closed_form',
+    'Random Forest': 'flat',
+    'K-Nearest Neighbors': 'kd_tree',
+}
+
+# Engines whose predictions differ from the pickled model's: kept out of the default choices
+APPROXIMATE_ENGINES = {
+    # Quantized leaf rates shift probabilities slightly (max about 2e-4) and can flip borderline labels
+    'Random Forest': {'compact'},
+    'K-Nearest Neighbors': {'kd_tree_scaled'},
+}
+
+
+def is_approximate(model_name, engine):
+    return engine in APPROXIMATE_ENGINES.get(model_name, ())
+
+
+def engine_choices(model_name, approximate=False):
+    """Engine names available for a model, 'sklearn' first; approximate engines only when asked for"""
+    return ['sklearn'] + [engine for engine in ENGINES.get(model_name, {})
+                          if approximate or not is_approximate(model_name, engine)]
+
+
+def current_version(data_dir=DATA_DIR):
+    """Name of the published model version, or None when serving data_dir itself"""
+    try:
+        with open(os.path.join(data_dir, CURRENT_FILE)) as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def model_dir(data_dir=DATA_DIR, version=None):
+    """Directory holding the pickles of a version (default: the published one)"""
+    version = version or current_version(data_dir)
+    if version is None:
+        return data_dir
+    return os.path.join(data_dir, VERSIONS_DIR, version)
+
+
+def publish_version(data_dir, version):
+    """Atomically make version the one load_model_files serves"""
+    path = os.path.join(data_dir, CURRENT_FILE)
+    with open(path + '.tmp', 'w') as file:
+        file.write(version + '\n')
+    os.replace(path + '.tmp', path)
+
+
+def save_version(models, data_dir=DATA_DIR, metadata=None, publish=True):
+    """Pickle models into a new version directory and return its name
+
+    The directory is written under a temporary name and renamed into place,
+    so a version is either complete or absent.
+    """
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    version, suffix = stamp, 1
+    while os.path.exists(os.path.join(data_dir, VERSIONS_DIR, version)):
+        suffix += 1
+        version = f"{stamp}-{suffix}"
+
+    target = os.path.join(data_dir, VERSIONS_DIR, version)
+    staging = target + '.tmp'
+    os.makedirs(staging)
+    for model_name, model in models.items():
+        with open(os.path.join(staging, MODEL_FILES[model_name]), 'wb') as file:
+            pickle.dump(model, file)
+    with open(os.path.join(staging, METADATA_FILE), 'w') as file:
+        json.dump({'version': version, **(metadata or {})}, file, indent=2, default=str)
+    os.rename(staging, target)
+
+    if publish:
+        publish_version(data_dir, version)
+    return version
+
+
+def model_signature(model_name, data_dir=DATA_DIR):
+    """Version string that changes whenever the served pickle file is replaced"""
+    info = os.stat(os.path.join(model_dir(data_dir), MODEL_FILES[model_name]))
+    return f"{current_version(data_dir) or 'base'}-{info.st_mtime_ns}-{info.st_size}"
+
+
+def load_model_files(data_dir=DATA_DIR, engines=None, version=None):
+    """Unpickle every model in MODEL_FILES, keyed by display name
+
+    Loads the published version (or the given one) when data_dir has
+    versions, otherwise the pickles in data_dir itself. engines optionally
+    maps a display name to an engine from ENGINES that replaces the
+    sklearn model, e.g. {'Random Forest': 'flat'}.
+    """
+    directory = model_dir(data_dir, version)
+    models = {}
+    for model_name, filename in MODEL_FILES.items():
+        with open(os.path.join(directory, filename), 'rb') as file:
+            models[model_name] = pickle.load(file)
+
+    for model_name, engine in (engines or {}).items():
+        if engine == 'sklearn':
+            continue
+        if engine not in ENGINES.get(model_name, {}):
+            raise ValueError(f"Unknown engine '{engine}' for {model_name}")
+        models[model_name] = ENGINES[model_name][engine](models[model_name])
+    return models
@@ -0,0 +1,131 @@
+# core/neighbors.py
+import numpy as np
+from sklearn.neighbors import BallTree, KDTree, NearestNeighbors
+
+INDEXES = {'kd_tree': KDTree, 'ball_tree': BallTree}
+
+
+class IndexedKNN:
+    """K-nearest-neighbour classifier over a prebuilt KD-tree or ball-tree
+
+    The index is built once over the reference points and every batch is
+    answered with a single vectorized query. index='brute' skips the tree
+    and searches the reference array in place, which keeps memory-mapped
+    points shared between processes. With scale=True the points
+    are standardised first so that chol (hundreds) does not drown out
+    0/1 flags like fbs; that changes the neighbourhoods, so a scaled
+    index is a different model from the pickled one.
+    """
+
+    def __init__(self, X, y, classes, n_neighbors=5, p=2, weights='uniform',
+                 index='kd_tree', scale=False, leaf_size=30):
+        if weights not in ('uniform', 'distance'):
+            raise ValueError(f"Unsupported weights: {weights}")
+        if index not in INDEXES and index != 'brute':
+            raise ValueError(f"Unsupported index: {index}")
+        self.classes_ = np.asarray(classes)
+        self.n_neighbors = n_neighbors
+        self.p = p
+        self.weights = weights
+        self.index = index
+        self.scale = scale
+        self.leaf_size = leaf_size
+        self._build(np.asarray(X, dtype=np.float64), self._encode(y))
+
+    @property
+    def params(self):
+        return {
+            'n_neighbors': self.n_neighbors, 'p': self.p, 'weights': self.weights,
+            'index': self.index, 'scale': self.scale, 'leaf_size': self.leaf_size,
+        }
+
+    def to_arrays(self):
+        """(arrays, params) for the artifact format; y is stored as class indices"""
+        return {'X': self._X, 'y': self._y, 'classes': self.classes_}, self.params
+
+    @classmethod
+    def from_arrays(cls, arrays, params):
+        knn = cls.__new__(cls)
+        knn.classes_ = arrays['classes']
+        for name, value in params.items():
+            setattr(knn, name, value)
+        knn._build(arrays['X'], arrays['y'])
+        return knn
+
+    @classmethod
+    def from_sklearn(cls, model, **kwargs):
+        """Build an index over the training points stored in a fitted KNeighborsClassifier"""
+        # A search's best_estimator_ keeps NumPy scalars; params go into the JSON artifact manifest
+        params = {key: value.item() if isinstance(value, np.generic) else value
+                  for key, value in dict(n_neighbors=model.n_neighbors, p=model.p, weights=model.weights).items()}
+        params.update(kwargs)
+        # _y holds class indices into classes_
+        return cls(model._fit_X, model.classes_[model._y], model.classes_, **params)
+
+    def _encode(self, y):
+        return np.searchsorted(self.classes_, np.asarray(y)).astype(np.intp)
+
+    def _build(self, X, y):
+        self._X = X
+        self._y = y
+        if self.scale:
+            self.mean_ = X.mean(axis=0)
+            std = X.std(axis=0)
+            self.scale_ = np.where(std > 0, std, 1.0)
+        if self.index == 'brute':
+            self.tree = NearestNeighbors(n_neighbors=self.n_neighbors, algorithm='brute',
+                                         metric='minkowski', p=self.p).fit(self._transform(X))
+        else:
+            self.tree = INDEXES[self.index](self._transform(X), leaf_size=self.leaf_size,
+                                            metric='minkowski', p=self.p)
+
+    def _transform(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if self.scale:
+            return (X - self.mean_) / self.scale_
+        return X
+
+    def extend(self, X, y):
+        """Append labelled reference points and rebuild the index"""
+        self._build(np.vstack([self._X, np.asarray(X, dtype=np.float64)]),
+                    np.concatenate([self._y, self._encode(y)]))
+
+    @property
+    def n_reference(self):
+        return len(self._y)
+
+    @property
+    def nbytes(self):
+        """Memory held by the index arrays plus the reference labels"""
+        if self.index == 'brute':
+            return self._X.nbytes + self._y.nbytes
+        return sum(array.nbytes for array in self.tree.get_arrays()) + self._y.nbytes
+
+    def kneighbors(self, X):
+        """Distances and reference indices of the nearest neighbours for a whole batch"""
+        if self.index == 'brute':
+            return self.tree.kneighbors(self._transform(X))
+        return self.tree.query(self._transform(X), k=self.n_neighbors)
+
+    def predict_proba(self, X):
+        distances, indices = self.kneighbors(X)
+        votes = self._y[indices]
+
+        if self.weights == 'uniform':
+            weights = np.ones_like(distances)
+        else:
+            # As in sklearn: exact matches take all the weight
+            with np.errstate(divide='ignore'):
+                weights = 1.0 / distances
+            exact = np.isinf(weights)
+            exact_rows = exact.any(axis=1)
+            weights[exact_rows] = exact[exact_rows]
+
+        proba = np.zeros((len(votes), len(self.classes_)))
+        for k in range(len(self.classes_)):
+            proba[:, k] = np.where(votes == k, weights, 0).sum(axis=1)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -0,0 +1,95 @@
+# core/online.py
+"""Fold newly labelled patients into the served models without a full refit
+
+The KNN reference set doubles as the training history: it holds the rows
+the models were fitted on, and every update appends the new rows to it.
+"""
+import logging
+import warnings
+
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import ConvergenceWarning
+
+from core.features import FEATURE_COLUMNS, TARGET_COLUMN
+from core.models import DATA_DIR, current_version, load_model_files, save_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEW_TREES = 50
+# lbfgs needs about 500 iterations on the unscaled features of heart-disease.csv
+DEFAULT_MAX_ITER = 1000
+
+
+class NotConverged(RuntimeError):
+    """Raised instead of saving a model whose refit stopped before converging"""
+
+
+def training_history(knn):
+    """Labelled rows stored in the KNN model, as a DataFrame in feature order"""
+    history = pd.DataFrame(knn._fit_X, columns=FEATURE_COLUMNS)
+    history[TARGET_COLUMN] = knn.classes_[knn._y]
+    return history
+
+
+def update_logistic_regression(model, X, y, max_iter=DEFAULT_MAX_ITER):
+    """Warm-start refit from the current coefficients
+
+    liblinear cannot warm start, so the update switches to lbfgs with the
+    same C and starts from the deployed coef_/intercept_. If lbfgs stops
+    at max_iter without converging, NotConverged is raised so the
+    half-fitted model is never saved.
+    """
+    model.set_params(solver='lbfgs', warm_start=True, max_iter=max_iter)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always', ConvergenceWarning)
+        model.fit(X, y)
+    model.set_params(warm_start=False)
+    if any(issubclass(warning.category, ConvergenceWarning) for warning in caught):
+        raise NotConverged(f"Logistic regression did not converge in {max_iter} lbfgs iterations; "
+                           f"nothing was saved, retry with a larger max_iter")
+    return model
+
+
+def update_random_forest(model, X, y, new_trees=DEFAULT_NEW_TREES):
+    """Keep every existing tree and grow new_trees more on the combined rows"""
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + new_trees)
+    model.fit(X, y)
+    model.set_params(warm_start=False)
+    return model
+
+
+def update_knn(model, X, y):
+    """Append the rows to the reference set (refitting only rebuilds the index)"""
+    return model.fit(X, y)
+
+
+def update_models(new_rows, data_dir=DATA_DIR, new_trees=DEFAULT_NEW_TREES,
+                  max_iter=DEFAULT_MAX_ITER, publish=True):
+    """Fold labelled rows into the served models and save them as a new version
+
+    The new version is written completely before it is published, so
+    processes loading models (or a ModelRegistry) only ever see a whole
+    version. Raises NotConverged, before anything is written, when the
+    logistic regression refit does not converge. Returns the new version name.
+    """
+    missing = [col for col in FEATURE_COLUMNS + [TARGET_COLUMN] if col not in new_rows.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    parent = current_version(data_dir)
+    models = load_model_files(data_dir)
+    history = training_history(models['K-Nearest Neighbors'])
+    combined = pd.concat([history, new_rows[FEATURE_COLUMNS + [TARGET_COLUMN]]], ignore_index=True)
+    X, y = combined[FEATURE_COLUMNS], combined[TARGET_COLUMN].to_numpy()
+    logger.info("Updating version %s with %d new rows (%d total)", parent or 'base', len(new_rows), len(combined))
+
+    update_logistic_regression(models['Logistic Regression'], X, y, max_iter=max_iter)
+    update_random_forest(models['Random Forest'], X, y, new_trees=new_trees)
+    update_knn(models['K-Nearest Neighbors'], X, y)
+
+    metadata = {
+        'parent': parent,
+        'update': {'new_rows': len(new_rows), 'total_rows': len(combined), 'new_trees': new_trees},
+    }
+    return save_version(models, data_dir, metadata, publish=publish)
@@ -0,0 +1,169 @@
+# core/registry.py
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from core.features import FEATURE_COLUMNS, FORM_DEFAULTS
+from core.models import DATA_DIR, MODEL_FILES, current_version, load_model_files, model_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Row used to smoke-test a freshly loaded version before it is swapped in
+SMOKE_ROWS = np.array([[FORM_DEFAULTS[feature] for feature in FEATURE_COLUMNS]], dtype=np.float64)
+
+
+def data_dir_label(data_dir=DATA_DIR):
+    """Label of the models currently on disk; changes when CURRENT or a served pickle changes"""
+    version = current_version(data_dir)
+    if version is not None:
+        return version
+    mtime = max(os.stat(os.path.join(data_dir, filename)).st_mtime_ns for filename in MODEL_FILES.values())
+    return f"base-{mtime}"
+
+
+def smoke_test(models):
+    """Raise if any model fails to give sane probabilities for SMOKE_ROWS"""
+    for model_name, model in models.items():
+        proba = np.asarray(model.predict_proba(SMOKE_ROWS))
+        if proba.shape != (len(SMOKE_ROWS), 2) or not np.all(np.isfinite(proba)) \
+                or not np.allclose(proba.sum(axis=1), 1):
+            raise ValueError(f"{model_name} returned invalid probabilities: {proba}")
+
+
+class ModelRegistry:
+    """Serve one model version at a time and hot-swap new versions in the background
+
+    A watcher thread polls label_fn; when the label changes it loads the
+    new version with load_fn, smoke-tests it and swaps it in atomically.
+    Callers take a lease on the current version for each prediction; a
+    replaced version stays referenced until its last lease is released.
+    Resources attached to a version (thread pools, batcher threads) are
+    closed once it is retired.
+    """
+
+    def __init__(self, load_fn, label_fn, poll_interval=DEFAULT_POLL_INTERVAL, history=1000):
+        self.load_fn = load_fn
+        self.label_fn = label_fn
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._leases = Counter()
+        self._retired = {}
+        self._attached = {}
+        self._rejected = None
+        self.last_error = None
+        self.swaps = 0
+        self.history = deque(maxlen=history)
+
+        label = label_fn()
+        self._version, self._models = label, load_fn()
+        self._thread = None
+        if poll_interval:
+            self._thread = threading.Thread(target=self._watch, daemon=True)
+            self._thread.start()
+
+    @classmethod
+    def for_data_dir(cls, data_dir=DATA_DIR, engines=None, **kwargs):
+        """Registry over the published version (or the pickles) in data_dir"""
+        return cls(lambda: load_model_files(data_dir, engines), lambda: data_dir_label(data_dir), **kwargs)
+
+    @property
+    def version(self):
+        return self._version
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Model registry refresh failed")
+
+    def refresh(self):
+        """Load, smoke-test and swap in the on-disk version if it changed; returns True on swap"""
+        label = self.label_fn()
+        if label == self._version or label == self._rejected:
+            return False
+
+        try:
+            models = self.load_fn()
+            smoke_test(models)
+        except Exception as e:
+            # A pickle caught mid-write changes label again once complete, so it is retried
+            self._rejected = label
+            self.last_error = f"{label}: {e}"
+            logger.error("Rejected model version %s: %s", label, e)
+            return False
+        if self.label_fn() != label:
+            return False
+
+        with self._lock:
+            retired = self._version
+            if self._leases[retired]:
+                self._retired[retired] = self._models
+                retired = None
+            self._version, self._models = label, models
+            self.swaps += 1
+        logger.info("Swapped in model version %s", label)
+        if retired is not None:
+            self._close_attached(retired)
+        return True
+
+    @contextmanager
+    def lease(self):
+        """Yield (version, models) and keep that version alive until the block exits"""
+        with self._lock:
+            version, models = self._version, self._models
+            self._leases[version] += 1
+        try:
+            yield version, models
+        finally:
+            retired = False
+            with self._lock:
+                self._leases[version] -= 1
+                if not self._leases[version]:
+                    del self._leases[version]
+                    retired = self._retired.pop(version, None) is not None
+            if retired:
+                self._close_attached(version)
+
+    def attach(self, version, resource):
+        """Close resource (anything with close()) when version is retired; at once if it already is"""
+        with self._lock:
+            live = version == self._version or version in self._retired
+            if live:
+                self._attached.setdefault(version, []).append(resource)
+        if not live:
+            resource.close()
+
+    def _close_attached(self, version):
+        with self._lock:
+            resources = self._attached.pop(version, [])
+        for resource in resources:
+            try:
+                resource.close()
+            except Exception:
+                logger.exception("Closing a resource of model version %s failed", version)
+
+    def record(self, version, model_name, rows=1):
+        """Note which version answered a prediction"""
+        self.history.append({'time': time.time(), 'version': version, 'model': model_name, 'rows': rows})
+
+    def status(self):
+        with self._lock:
+            in_flight = dict(self._leases)
+            retired = list(self._retired)
+        return {
+            'version': self._version,
+            'swaps': self.swaps,
+            'in_flight': in_flight,
+            'retired_versions_held': retired,
+            'last_error': self.last_error,
+            'recent_predictions': list(self.history)[-10:],
+        }
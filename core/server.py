@@ -0,0 +1,276 @@
+# core/server.py
+"""Headless HTTP inference service for the pickled models
+
+Run with:  python -m core.server --port 8000 --workers 4
+"""
+import argparse
+import asyncio
+import io
+import os
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from core.artifacts import LazyModels
+from core.batch import model_slug, predict_matrix
+from core.coalescer import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, coalesce_models
+from core.features import FEATURE_COLUMNS
+from core.metrics import CONTENT_TYPE, METRICS
+from core.models import DATA_DIR, FAST_ENGINES, MODEL_FILES, load_model_files
+from core.validation import InvalidRows, validate_frame, validate_matrix
+
+# Models loaded once per worker process (or once in-process for the thread pool)
+_worker_models = None
+
+
+def _load_models(data_dir, engines, artifacts):
+    if artifacts:
+        # Memory-mapped arrays: every worker shares the same pages
+        return LazyModels(artifacts)
+    return load_model_files(data_dir, engines)
+
+
+def _init_worker(data_dir, engines=None, artifacts=None):
+    global _worker_models
+    _worker_models = _load_models(data_dir, engines, artifacts)
+
+
+def _init_coalescing_worker(data_dir, engines, artifacts, coalesce):
+    global _worker_models
+    _worker_models = coalesce_models(_load_models(data_dir, engines, artifacts), **coalesce)
+
+
+def _score(X, model_names):
+    """Run each requested model once over X inside a pool worker"""
+    results = {}
+    for model_name in model_names:
+        predictions, probabilities, confidences = predict_matrix(_worker_models[model_name], X, model_name)
+        results[model_name] = {
+            'prediction': predictions.tolist(),
+            'probability': probabilities.tolist(),
+            'confidence': confidences.tolist(),
+        }
+    return results
+
+
+def _score_and_drain(X, model_names):
+    """_score for process workers, also handing back the metrics recorded in the worker"""
+    return _score(X, model_names), METRICS.drain()
+
+
+def rows_to_matrix(rows):
+    """Build the feature matrix from JSON rows (objects keyed by feature or 13-value lists)"""
+    if not isinstance(rows, list) or not rows:
+        raise ValueError("Expected a non-empty list of rows")
+    matrix = []
+    for row in rows:
+        if isinstance(row, dict):
+            missing = [col for col in FEATURE_COLUMNS if col not in row]
+            if missing:
+                raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+            matrix.append([row[col] for col in FEATURE_COLUMNS])
+        elif isinstance(row, list) and len(row) == len(FEATURE_COLUMNS):
+            matrix.append(row)
+        else:
+            raise ValueError(f"Each row must be an object or a list of {len(FEATURE_COLUMNS)} values")
+    return np.array(matrix, dtype=np.float64)
+
+
+def select_models(requested):
+    """Validate an optional list of model names, defaulting to all models"""
+    if requested is None:
+        return list(MODEL_FILES)
+    unknown = [name for name in requested if name not in MODEL_FILES]
+    if unknown:
+        raise ValueError(f"Unknown models: {', '.join(unknown)}")
+    return list(requested)
+
+
+async def read_request(request, batch):
+    """Return (feature matrix, model names, CSV frame or None, validation report) for a request body
+
+    Invalid rows fail the whole request, except in a CSV batch: there the
+    matrix holds only the valid rows and the report says which were left out.
+    """
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith('text/csv'):
+        frame = pd.read_csv(io.BytesIO(await request.body()))
+        requested = request.query_params.get('models')
+        model_names = select_models(requested.split(',') if requested else None)
+        with METRICS.timer('hfp_prediction_stage_seconds', model='all', stage='build_input'):
+            X, report = validate_frame(frame)
+        if not batch or not report.valid.any():
+            report.raise_for_invalid()
+        if not report.valid.any():
+            # A header with no rows: there is nothing to score
+            raise ValueError("Expected at least one row to score")
+        return X[report.valid], model_names, frame, report
+
+    payload = await request.json()
+    with METRICS.timer('hfp_prediction_stage_seconds', model='all', stage='build_input'):
+        X = rows_to_matrix(payload.get('rows') if batch else [payload.get('features')])
+        report = validate_matrix(X)
+    report.raise_for_invalid()
+    return X, select_models(payload.get('models')), None, report
+
+
+def error_response(error):
+    """400 response for a bad request, listing the first row-level violations of invalid input"""
+    body = {'error': str(error)}
+    if isinstance(error, InvalidRows):
+        body['violations'] = error.report.records(limit=100)
+    return JSONResponse(body, status_code=400)
+
+
+def create_app(data_dir=DATA_DIR, workers=None, pool='process', coalesce=None, engines=None,
+               artifacts=None):
+    """Build the Starlette app with a worker pool for the CPU-bound scoring
+
+    engines is passed to load_model_files to pick an inference engine per model
+    (default FAST_ENGINES; map a model to 'sklearn' to serve its pickle as is);
+    artifacts, a directory written by scripts/convert_models.py, replaces the pickles.
+    coalesce, if given, is a dict of MicroBatcher settings (max_batch_size,
+    max_wait_ms); single-row requests are then merged into shared model calls.
+    """
+    workers = workers or os.cpu_count()
+    engines = FAST_ENGINES if engines is None else engines
+    state = {}
+
+    @asynccontextmanager
+    async def lifespan(app):
+        state['drain'] = coalesce is None and pool == 'process'
+        if coalesce is not None:
+            # Coalescing needs every request thread to share one set of batchers
+            _init_coalescing_worker(data_dir, engines, artifacts, coalesce)
+            executor = ThreadPoolExecutor(max_workers=max(workers, 4 * coalesce['max_batch_size']))
+        elif pool == 'thread':
+            _init_worker(data_dir, engines, artifacts)
+            executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                           initargs=(data_dir, engines, artifacts))
+        # Start every worker now so no request pays for unpickling the models
+        warmup = np.zeros((1, len(FEATURE_COLUMNS)))
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(executor, _score, warmup, [])
+            for _ in range(workers)
+        ])
+        state['executor'] = executor
+        yield
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run_models(X, model_names):
+        loop = asyncio.get_running_loop()
+        if not state['drain']:
+            return await loop.run_in_executor(state['executor'], _score, X, model_names)
+        # Per-model metrics are recorded in the worker process and merged here
+        results, worker_metrics = await loop.run_in_executor(
+            state['executor'], _score_and_drain, X, model_names
+        )
+        METRICS.merge(worker_metrics)
+        return results
+
+    def timed(route, handler):
+        """Record the latency of every request to route"""
+        async def endpoint(request):
+            with METRICS.timer('hfp_http_request_seconds', route=route):
+                return await handler(request)
+        return endpoint
+
+    async def metrics(request):
+        return Response(METRICS.render(), media_type=CONTENT_TYPE)
+
+    async def health(request):
+        return JSONResponse({'status': 'ok', 'models': list(MODEL_FILES)})
+
+    async def stats(request):
+        if coalesce is None:
+            return JSONResponse({'coalescing': False})
+        return JSONResponse({
+            'coalescing': True,
+            'models': {name: model.stats() for name, model in _worker_models.items()},
+        })
+
+    async def predict(request):
+        try:
+            X, model_names, _, _ = await read_request(request, batch=False)
+        except (ValueError, TypeError, AttributeError) as e:
+            return error_response(e)
+        if len(X) != 1:
+            return JSONResponse({'error': "Use /predict/batch for more than one row"}, status_code=400)
+        results = await run_models(X, model_names)
+        return JSONResponse({
+            'models': {
+                name: {key: values[0] for key, values in result.items()}
+                for name, result in results.items()
+            }
+        })
+
+    async def predict_batch(request):
+        try:
+            X, model_names, frame, report = await read_request(request, batch=True)
+        except (ValueError, TypeError, AttributeError) as e:
+            return error_response(e)
+        results = await run_models(X, model_names)
+        if frame is None:
+            return JSONResponse({'rows': len(X), 'models': results})
+
+        # Rows that failed validation keep empty predictions and say why
+        output = frame.copy()
+        scored = frame.index[report.valid]
+        for name, result in results.items():
+            output[f'{model_slug(name)}_prediction'] = pd.Series(pd.array(result['prediction']), index=scored)
+            output[f'{model_slug(name)}_probability'] = pd.Series(result['probability'], index=scored)
+        if not report.ok:
+            output['validation_error'] = report.row_errors()
+        return Response(output.to_csv(index=False), media_type='text/csv')
+
+    return Starlette(
+        routes=[
+            Route('/health', health, methods=['GET']),
+            Route('/stats', stats, methods=['GET']),
+            Route('/metrics', metrics, methods=['GET']),
+            Route('/predict', timed('/predict', predict), methods=['POST']),
+            Route('/predict/batch', timed('/predict/batch', predict_batch), methods=['POST']),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the heart disease models over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Scoring pool size (default: one per core)")
+    parser.add_argument('--pool', choices=['process', 'thread'], default='process')
+    parser.add_argument('--coalesce', action='store_true',
+                        help="Merge concurrent single-row requests into micro-batches")
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument('--engine', action='append', default=[], metavar='MODEL=ENGINE',
+                        help="Inference engine for a model, overriding the fast exact default, "
+                             "e.g. 'Random Forest=sklearn' (repeatable)")
+    parser.add_argument('--artifacts', default=None, metavar='DIR',
+                        help="Serve memory-mapped array artifacts instead of the pickles")
+    args = parser.parse_args()
+
+    engines = {**FAST_ENGINES, **dict(option.split('=', 1) for option in args.engine)}
+    coalesce = None
+    if args.coalesce:
+        coalesce = {'max_batch_size': args.max_batch_size, 'max_wait_ms': args.max_wait_ms}
+    app = create_app(args.data_dir, workers=args.workers, pool=args.pool, coalesce=coalesce,
+                     engines=engines, artifacts=args.artifacts)
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
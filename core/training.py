@@ -0,0 +1,193 @@
+# core/training.py
+"""Reproducible version of the notebook's model training and tuning
+
+Runs the same searches as end-to-end-heart-disease-classification.ipynb
+on every core, using successive halving for the Random Forest so that
+unpromising configurations are dropped after a few cheap rounds.
+"""
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import GridSearchCV, HalvingRandomSearchCV, train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+
+from core.features import FEATURE_COLUMNS, TARGET_COLUMN
+from core.models import DATA_DIR, save_version
+
+logger = logging.getLogger(__name__)
+
+# Hyperparameter grids from the notebook
+LOG_REG_GRID = {
+    'C': np.logspace(-4, 4, 30),
+    'solver': ['liblinear'],
+}
+RF_GRID = {
+    'n_estimators': np.arange(10, 1000, 50),
+    'max_depth': [None, 3, 5, 10],
+    'min_samples_split': np.arange(2, 20, 2),
+    'min_samples_leaf': np.arange(1, 20, 2),
+}
+KNN_GRID = {
+    'n_neighbors': np.arange(1, 21),
+}
+
+# Random Forest candidates per successive-halving round; the budget is checked between rounds
+RF_ROUND_CANDIDATES = 27
+RF_PROBE_TREES = 10
+
+
+class StageTimer:
+    """Log and record the wall time of each pipeline stage"""
+
+    def __init__(self, time_budget=None):
+        self.start = time.perf_counter()
+        self.deadline = self.start + time_budget if time_budget else None
+        self.stages = {}
+
+    def remaining(self):
+        if self.deadline is None:
+            return float('inf')
+        return self.deadline - time.perf_counter()
+
+    def run(self, name, fn, *args, **kwargs):
+        logger.info("%s: started", name)
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.stages[name] = time.perf_counter() - start
+        logger.info("%s: %.2fs", name, self.stages[name])
+        return result
+
+
+def search_logistic_regression(X, y, cv, n_jobs):
+    search = GridSearchCV(LogisticRegression(), param_grid=LOG_REG_GRID, cv=cv, n_jobs=n_jobs)
+    search.fit(X, y)
+    return search
+
+
+def search_knn(X, y, cv, n_jobs):
+    search = GridSearchCV(KNeighborsClassifier(), param_grid=KNN_GRID, cv=cv, n_jobs=n_jobs)
+    search.fit(X, y)
+    return search
+
+
+def search_random_forest(X, y, cv, n_jobs, n_candidates, seed, timer=None):
+    """Successive halving over RF_GRID: many candidates on few rows, the best on all rows
+
+    The candidates are searched in rounds of at most RF_ROUND_CANDIDATES.
+    Each round is sized from the measured cost of one fit, so it ends
+    within the timer's remaining budget, and no round starts once the
+    budget is spent. Returns the round with the best score, or None if not
+    even one candidate fitted the budget.
+    """
+    timer = timer or StageTimer()
+    # Seconds per tree, from a small full-depth forest and then from each round
+    start = time.perf_counter()
+    RandomForestClassifier(n_estimators=RF_PROBE_TREES, random_state=seed).fit(X, y)
+    seconds_per_tree = (time.perf_counter() - start) / RF_PROBE_TREES
+    max_trees = max(RF_GRID['n_estimators'])
+
+    best, searched, rounds = None, 0, 0
+    while searched < n_candidates:
+        # Halving fits n + n/3 + n/9 + ... < 1.5n candidates per fold, plus the refit of the best;
+        # sized as if every candidate were the largest forest in the grid
+        affordable = (timer.remaining() / (seconds_per_tree * max_trees) - 1) / (1.5 * cv)
+        size = int(min(RF_ROUND_CANDIDATES, n_candidates - searched, affordable))
+        if size < 1:
+            logger.warning("Random Forest search: budget spent after %d of %d candidates", searched, n_candidates)
+            break
+        search = HalvingRandomSearchCV(
+            RandomForestClassifier(random_state=seed),
+            param_distributions=RF_GRID,
+            n_candidates=size,
+            factor=3,
+            # The last iteration of every round, however small, scores on (nearly) all rows
+            min_resources='exhaust',
+            cv=cv,
+            n_jobs=n_jobs,
+            random_state=seed + rounds,
+        )
+        start = time.perf_counter()
+        search.fit(X, y)
+        trees = cv * sum(params['n_estimators'] for params in search.cv_results_['params'])
+        trees += search.best_params_['n_estimators']
+        seconds_per_tree = (time.perf_counter() - start) / trees
+        searched += size
+        rounds += 1
+        logger.info("Random Forest round %d: %d candidates, best score %.4f", rounds, size, search.best_score_)
+        if best is None or search.best_score_ > best.best_score_:
+            best = search
+    return best
+
+
+def evaluate(model, X, y):
+    proba = model.predict_proba(X)[:, 1]
+    return {
+        'accuracy': float(accuracy_score(y, model.classes_[(proba > 0.5).astype(int)])),
+        'roc_auc': float(roc_auc_score(y, proba)),
+    }
+
+
+def train(data, data_dir=DATA_DIR, test_size=0.2, cv=5, n_jobs=-1, rf_candidates=200,
+          time_budget=None, seed=42, publish=True):
+    """Tune, evaluate and save all three models as a new version
+
+    Stages that would start after the time budget is spent fall back to
+    the model's default hyperparameters instead of searching; the Random
+    Forest search stops between rounds and keeps its best round so far.
+    Returns (version, metadata).
+    """
+    timer = StageTimer(time_budget)
+    X = data[FEATURE_COLUMNS]
+    y = data[TARGET_COLUMN]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size,
+                                                        random_state=seed, stratify=y)
+    logger.info("Training on %d rows, evaluating on %d", len(X_train), len(X_test))
+
+    searches = {
+        'Logistic Regression': (lambda: search_logistic_regression(X_train, y_train, cv, n_jobs),
+                                lambda: LogisticRegression(solver='liblinear')),
+        'K-Nearest Neighbors': (lambda: search_knn(X_train, y_train, cv, n_jobs),
+                                lambda: KNeighborsClassifier()),
+        'Random Forest': (lambda: search_random_forest(X_train, y_train, cv, n_jobs,
+                                                       rf_candidates, seed, timer),
+                          lambda: RandomForestClassifier(n_jobs=n_jobs, random_state=seed)),
+    }
+
+    models, metadata = {}, {'models': {}}
+    for model_name, (search, default) in searches.items():
+        result = timer.run(f"search {model_name}", search) if timer.remaining() > 0 else None
+        if result is not None:
+            model = result.best_estimator_
+            # Grid values are NumPy scalars; store plain ints and floats in the pickle and the metadata
+            params = {key: value.item() if isinstance(value, np.generic) else value
+                      for key, value in result.best_params_.items()}
+            model.set_params(**params)
+        else:
+            logger.warning("%s: time budget spent, fitting default hyperparameters", model_name)
+            model = timer.run(f"fit {model_name}", default().fit, X_train, y_train)
+            params = {}
+        # Searches ran in parallel; serve single-row predictions without pool start-up
+        if hasattr(model, 'n_jobs'):
+            model.set_params(n_jobs=None)
+        models[model_name] = model
+        metadata['models'][model_name] = {
+            'params': params,
+            'test': evaluate(model, X_test, y_test),
+        }
+
+    metadata.update({
+        'rows': len(data),
+        'test_size': test_size,
+        'seed': seed,
+        'stages': timer.stages,
+    })
+    version = timer.run("save", save_version, models, data_dir, metadata, publish)
+    metadata['stages'] = timer.stages
+    logger.info("Saved version %s in %.2fs total", version, time.perf_counter() - timer.start)
+    return version, metadata
@@ -0,0 +1,125 @@
+# core/validation.py
+"""Columnar validation of model inputs against FEATURE_SCHEMA
+
+A batch is checked in a handful of whole-matrix passes (missing values,
+non-integers, range bounds, then one membership test per coded feature),
+so millions of rows cost a few array operations, not a loop per row.
+"""
+import numpy as np
+import pandas as pd
+
+from core.features import FEATURE_COLUMNS, FEATURE_SCHEMA
+
+# Row-level violations kept in a report; the per-feature counts are always complete
+MAX_REPORTED = 1000
+
+PROBLEMS = ['missing or not numeric', 'not an integer', 'below minimum', 'above maximum', 'unknown code']
+
+_CODED = [(column, np.array(list(FEATURE_SCHEMA[feature]['codes']), dtype=np.float64))
+          for column, feature in enumerate(FEATURE_COLUMNS) if 'codes' in FEATURE_SCHEMA[feature]]
+_RANGED = np.array(['codes' not in FEATURE_SCHEMA[feature] for feature in FEATURE_COLUMNS])
+_INTEGER = _RANGED & np.array([FEATURE_SCHEMA[feature]['dtype'] == 'int' for feature in FEATURE_COLUMNS])
+_MIN = np.array([FEATURE_SCHEMA[feature].get('min', -np.inf) for feature in FEATURE_COLUMNS], dtype=np.float64)
+_MAX = np.array([FEATURE_SCHEMA[feature].get('max', np.inf) for feature in FEATURE_COLUMNS], dtype=np.float64)
+
+
+class InvalidRows(ValueError):
+    """Raised when a batch that must be entirely valid is not"""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__(f"{report.n_invalid} of {report.n_rows} rows failed validation: {report.describe()}")
+
+
+class ValidationReport:
+    """Which rows passed, how many values broke each rule, and the first violations in detail"""
+
+    def __init__(self, valid, counts, violations, problems, index):
+        self.valid = valid
+        self.counts = counts
+        self.violations = violations
+        self.problems = problems
+        self.index = index
+
+    @property
+    def n_rows(self):
+        return len(self.valid)
+
+    @property
+    def n_invalid(self):
+        return int(self.n_rows - self.valid.sum())
+
+    @property
+    def ok(self):
+        return bool(self.valid.all())
+
+    def describe(self):
+        """One line per broken rule, e.g. 'ca above maximum (5 rows)'"""
+        return "; ".join(f"{feature} {problem} ({count} rows)" for (feature, problem), count in self.counts.items())
+
+    def row_errors(self):
+        """Every problem of each invalid row as one string, indexed by row label"""
+        invalid = np.flatnonzero(~self.valid)
+        return pd.Series([
+            "; ".join(f"{FEATURE_COLUMNS[column]} {PROBLEMS[self.problems[row, column] - 1]}"
+                      for column in np.flatnonzero(self.problems[row]))
+            for row in invalid
+        ], index=self.index[invalid], dtype=object)
+
+    def records(self, limit=None):
+        """Violations as JSON-safe dicts, with missing values as None"""
+        violations = self.violations if limit is None else self.violations.head(limit)
+        return [row | {'value': None if np.isnan(row['value']) else row['value']}
+                for row in violations.to_dict('records')]
+
+    def raise_for_invalid(self):
+        if not self.ok:
+            raise InvalidRows(self)
+
+
+def validate_matrix(X, index=None, max_reported=MAX_REPORTED):
+    """Check a (rows, 13) float matrix in FEATURE_COLUMNS order
+
+    index labels the rows in the violations table (default 0..n-1).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    problems = np.zeros(X.shape, dtype=np.int8)
+    # Later rules overwrite earlier ones, so each value reports its most basic problem
+    problems[X > _MAX] = 4
+    problems[X < _MIN] = 3
+    problems[_INTEGER & (X != np.round(X))] = 2
+    for column, codes in _CODED:
+        problems[~np.isin(X[:, column], codes), column] = 5
+    problems[np.isnan(X)] = 1
+
+    bad = problems > 0
+    valid = ~bad.any(axis=1)
+    rows, columns = np.nonzero(bad)
+    codes = problems[rows, columns]
+    counts = pd.Series(
+        np.bincount(columns * len(PROBLEMS) + codes - 1, minlength=len(FEATURE_COLUMNS) * len(PROBLEMS)),
+        index=pd.MultiIndex.from_product([FEATURE_COLUMNS, PROBLEMS], names=['feature', 'problem']),
+    )
+    counts = counts[counts > 0]
+
+    rows, columns, codes = rows[:max_reported], columns[:max_reported], codes[:max_reported]
+    labels = pd.RangeIndex(len(X)) if index is None else pd.Index(index)
+    violations = pd.DataFrame({
+        'row': labels[rows],
+        'feature': np.array(FEATURE_COLUMNS, dtype=object)[columns],
+        'value': X[rows, columns],
+        'problem': np.array(PROBLEMS, dtype=object)[codes - 1],
+    })
+    return ValidationReport(valid, counts, violations, problems, labels)
+
+
+def validate_frame(data, max_reported=MAX_REPORTED):
+    """(feature matrix, report) for a DataFrame; text and blanks count as missing values"""
+    missing = [col for col in FEATURE_COLUMNS if col not in data.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+    columns = data[FEATURE_COLUMNS]
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in columns.dtypes):
+        columns = columns.apply(pd.to_numeric, errors='coerce')
+    X = np.ascontiguousarray(columns.to_numpy(dtype=np.float64, na_value=np.nan))
+    return X, validate_matrix(X, index=data.index, max_reported=max_reported)
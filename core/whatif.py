@@ -0,0 +1,63 @@
+# core/whatif.py
+"""What-if sweeps: one patient scored with one or two features varied across their range
+
+Every sweep builds the whole grid of patient rows up front and scores it with
+a single predict_proba call per model, instead of one call per grid point.
+"""
+import numpy as np
+import pandas as pd
+
+from core.batch import predict_matrix
+from core.features import FEATURE_COLUMNS, FORM_VALUES
+
+# Grid points per axis for 2-D surfaces; 1-D curves use every value the form allows
+MAX_SURFACE_POINTS = 60
+
+
+def sweep_values(feature, max_points=None):
+    """The values the Predictor form allows for feature, thinned evenly to max_points"""
+    values = np.asarray(FORM_VALUES[feature], dtype=np.float64)
+    if max_points and len(values) > max_points:
+        values = values[np.unique(np.linspace(0, len(values) - 1, max_points).round().astype(int))]
+    return values
+
+
+def sweep_matrix(features, sweeps):
+    """Copies of the patient's 13 features with each (feature, values) pair varied over a full grid
+
+    Rows are in C order over the sweeps, so the last sweep varies fastest.
+    """
+    grids = np.meshgrid(*[values for _, values in sweeps], indexing='ij')
+    X = np.tile(np.asarray(features, dtype=np.float64), (grids[0].size, 1))
+    for (feature, _), grid in zip(sweeps, grids):
+        X[:, FEATURE_COLUMNS.index(feature)] = grid.ravel()
+    return X
+
+
+def score_sweep(models, X, executor=None):
+    """Heart disease probability of every row per model, plus failures from the executor"""
+    if executor is None:
+        return {model_name: predict_matrix(model, X, model_name)[1] for model_name, model in models.items()}, {}
+    results, _, failures = executor.run(X, list(models))
+    return {model_name: probabilities for model_name, (_, probabilities, _) in results.items()}, failures
+
+
+def sweep_1d(models, features, feature, values=None, executor=None):
+    """Risk curve per model as a DataFrame indexed by the swept values"""
+    values = sweep_values(feature) if values is None else np.asarray(values, dtype=np.float64)
+    risks, failures = score_sweep(models, sweep_matrix(features, [(feature, values)]), executor)
+    return pd.DataFrame(risks, index=pd.Index(values, name=feature)), failures
+
+
+def sweep_2d(models, features, x_feature, y_feature, x_values=None, y_values=None, executor=None,
+             max_points=MAX_SURFACE_POINTS):
+    """Risk surface per model, each shaped (len(y_values), len(x_values))
+
+    Returns (x_values, y_values, surfaces, failures).
+    """
+    x_values = sweep_values(x_feature, max_points) if x_values is None else np.asarray(x_values, dtype=np.float64)
+    y_values = sweep_values(y_feature, max_points) if y_values is None else np.asarray(y_values, dtype=np.float64)
+    X = sweep_matrix(features, [(y_feature, y_values), (x_feature, x_values)])
+    risks, failures = score_sweep(models, X, executor)
+    surfaces = {model_name: risk.reshape(len(y_values), len(x_values)) for model_name, risk in risks.items()}
+    return x_values, y_values, surfaces, failures
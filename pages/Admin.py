@@ -0,0 +1,52 @@
+# pages/Admin.py
+import os
+
+import streamlit as st
+import pandas as pd
+
+from core.metrics import METRICS
+
+def show_hot_path(models):
+    """The model that has spent the most time predicting overall, and the others after it"""
+    if models.empty:
+        return
+    time_per_model = models.groupby('model')['total_ms'].sum().sort_values(ascending=False)
+    st.header("🔥 Hot Path")
+    hot_cols = st.columns(len(time_per_model))
+    for col, (model_name, total_ms) in zip(hot_cols, time_per_model.items()):
+        with col:
+            st.metric(model_name, f"{total_ms:.1f} ms total")
+
+def show():
+    st.title("🛠️ Prediction Metrics")
+    st.markdown("Latency and call counts recorded by this app process since it started (or since the last reset).")
+    
+    counters, histograms = METRICS.snapshot()
+    if not counters and not histograms:
+        st.info("No predictions recorded yet. Make a prediction on the predictor page first.")
+        return
+    
+    stages = pd.DataFrame(histograms)
+    # Only counters may have been recorded yet, e.g. cache hits without any timed prediction
+    if 'model' in stages:
+        show_hot_path(stages[(stages['metric'] == 'hfp_prediction_stage_seconds') & (stages['model'] != 'all')])
+    
+    st.header("⏱️ Latency by Model and Stage")
+    if stages.empty:
+        st.info("No latencies recorded yet.")
+    else:
+        st.caption("Percentiles are the upper bounds of histogram buckets.")
+        st.dataframe(stages.drop(columns='metric').set_index(['model', 'stage']) if 'stage' in stages else stages)
+    
+    st.header("🔢 Counters")
+    st.dataframe(pd.DataFrame(counters))
+    
+    with st.expander("Prometheus text format"):
+        port = os.environ.get('HFP_METRICS_PORT')
+        if port:
+            st.markdown(f"Scraped from `http://127.0.0.1:{port}/metrics`.")
+        st.code(METRICS.render(), language='text')
+    
+    if st.button("Reset metrics"):
+        METRICS.clear()
+        st.rerun()
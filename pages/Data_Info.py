@@ -1,7 +1,88 @@
 # data_info_page.py
+import os
+
 import streamlit as st
 import pandas as pd
 
+from core.dataset import source_fingerprint
+from core.features import FEATURE_COLUMNS, FEATURE_SCHEMA
+
+# Point HFP_IMPORTANCE_CSV at a larger labelled holdout to rank features on it instead
+IMPORTANCE_DATA = os.environ.get('HFP_IMPORTANCE_CSV', 'heart-disease.csv')
+
+def feature_row(feature):
+    """Data Information table row for one feature, built from its FEATURE_SCHEMA entry"""
+    spec = FEATURE_SCHEMA[feature]
+    if 'codes' in spec:
+        values = ", ".join(f"{code} = {meaning}" for code, meaning in spec['codes'].items())
+        codes = list(spec['codes'])
+        typical = f"Binary ({codes[0]} or {codes[1]})" if len(codes) == 2 else f"{codes[0]}-{codes[-1]}"
+        accepted = f"One of {', '.join(map(str, codes))}"
+    else:
+        unit = f" ({spec['unit']})" if 'unit' in spec else ""
+        values = f"Numerical value{unit}"
+        low, high = spec['typical']
+        typical = f"{low}-{high}{' ' + spec['unit'] if 'unit' in spec else ''}"
+        accepted = f"{'Whole number' if spec['dtype'] == 'int' else 'Number'} from {spec['min']} to {spec['max']}"
+    return {
+        'Feature': feature,
+        'Description': spec['description'],
+        'Impact': spec['impact'],
+        'Values': values,
+        'Range': typical,
+        'Accepted': accepted,
+    }
+
+# Keyed by the dataset's size and modification time, so the file is only hashed when it changes.
+# The report itself is read on every render: a miss must not stick once the report has been written.
+@st.cache_data(show_spinner=False)
+def cached_dataset_hash(path, fingerprint):
+    from core.importance import dataset_hash
+    return dataset_hash(path)
+
+def show_feature_importance():
+    """Rank the features by how much each served model relies on them, from the importance cache"""
+    # Imported here so that loading this page does not pull in sklearn, scipy and plotly.express
+    import plotly.express as px
+    from core.importance import compute_importance, importance_frame, load_importance
+    
+    try:
+        data_hash = cached_dataset_hash(IMPORTANCE_DATA, source_fingerprint(IMPORTANCE_DATA))
+        report = load_importance(IMPORTANCE_DATA, data_hash=data_hash)
+    except FileNotFoundError as e:
+        st.warning(f"Feature importance unavailable: {e}")
+        return
+    
+    if report is None:
+        st.info(f"Feature importance has not been computed for the current models and `{IMPORTANCE_DATA}` yet. "
+                "Run `python -m scripts.importance` or compute it here.")
+        if st.button("📊 Compute Feature Importance"):
+            with st.spinner("Shuffling each feature for every model..."):
+                compute_importance(IMPORTANCE_DATA)
+            st.rerun()
+        return
+    
+    frame = importance_frame(report)
+    methods = {"Permutation (drop in ROC-AUC)": 'permutation', "Impurity (Random Forest)": 'impurity'}
+    method = methods[st.radio("**Importance**", options=list(methods), horizontal=True)]
+    ranked = frame[frame['method'] == method].sort_values('importance')
+    fig = px.bar(
+        ranked, x='importance', y='feature', color='model', barmode='group', orientation='h',
+        error_x=ranked['ci_high'] - ranked['importance'],
+        error_x_minus=ranked['importance'] - ranked['ci_low'],
+        labels={'importance': 'Importance', 'feature': ''},
+        title='Feature Importance per Model'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("**Most Important Predictive Features:**")
+    for model_name, rows in ranked.groupby('model', sort=False):
+        top = rows.sort_values('importance', ascending=False).head(5)
+        st.markdown(f"- **{model_name}**: " + ", ".join(f"`{feature}`" for feature in top['feature']))
+    st.caption(f"Measured on {report['n_rows']:,} rows of `{report['dataset']}` for model version "
+               f"`{report['model_version']}`, {report['repeats']} shuffles per feature, with "
+               f"{report['confidence']:.0%} confidence intervals.")
+
 def show():
     st.title("📊 Data Information")
     st.markdown("""
@@ -16,100 +97,8 @@ def show():
         st.header("Input Features (Clinical Parameters)")
         st.markdown("These are the patient characteristics used to make predictions.")
         
-        # Input features data
-        input_features = [
-            {
-                'Feature': 'age',
-                'Description': 'Age of the patient',
-                'Impact': 'Older age is generally associated with higher risk of heart disease',
-                'Values': 'Numerical value (in years)',
-                'Range': '29-77 years'
-            },
-            {
-                'Feature': 'sex',
-                'Description': 'Biological sex of the patient',
-                'Impact': 'Gender can influence heart disease risk patterns',
-                'Values': '0 = Female, 1 = Male',
-                'Range': 'Binary (0 or 1)'
-            },
-            {
-                'Feature': 'cp',
-                'Description': 'Chest pain type',
-                'Impact': 'Different types of chest pain indicate varying levels of cardiac risk',
-                'Values': '0: Typical Angina, 1: Atypical Angina, 2: Non-anginal Pain, 3: Asymptomatic',
-                'Range': '0-3'
-            },
-            {
-                'Feature': 'trestbps',
-                'Description': 'Resting blood pressure',
-                'Impact': 'Higher blood pressure increases strain on the heart',
-                'Values': 'Numerical value (mm Hg)',
-                'Range': '94-200 mm Hg'
-            },
-            {
-                'Feature': 'chol',
-                'Description': 'Serum cholesterol level',
-                'Impact': 'High cholesterol can lead to artery blockage and heart disease',
-                'Values': 'Numerical value (mg/dl)',
-                'Range': '126-564 mg/dl'
-            },
-            {
-                'Feature': 'fbs',
-                'Description': 'Fasting blood sugar',
-                'Impact': 'High blood sugar is associated with diabetes and increased heart disease risk',
-                'Values': '0 = False (≤120 mg/dl), 1 = True (>120 mg/dl)',
-                'Range': 'Binary (0 or 1)'
-            },
-            {
-                'Feature': 'restecg',
-                'Description': 'Resting electrocardiographic results',
-                'Impact': 'Abnormal ECG patterns can indicate heart problems',
-                'Values': '0: Normal, 1: ST-T wave abnormality, 2: Left ventricular hypertrophy',
-                'Range': '0-2'
-            },
-            {
-                'Feature': 'thalach',
-                'Description': 'Maximum heart rate achieved',
-                'Impact': 'Lower maximum heart rate may indicate reduced cardiac capacity',
-                'Values': 'Numerical value (beats per minute)',
-                'Range': '71-202 bpm'
-            },
-            {
-                'Feature': 'exang',
-                'Description': 'Exercise induced angina',
-                'Impact': 'Chest pain during exercise is a strong indicator of heart disease',
-                'Values': '0 = No, 1 = Yes',
-                'Range': 'Binary (0 or 1)'
-            },
-            {
-                'Feature': 'oldpeak',
-                'Description': 'ST depression induced by exercise relative to rest',
-                'Impact': 'Higher values indicate more significant ECG changes during stress',
-                'Values': 'Numerical value',
-                'Range': '0.0-6.2'
-            },
-            {
-                'Feature': 'slope',
-                'Description': 'Slope of the peak exercise ST segment',
-                'Impact': 'Specific slope patterns can indicate coronary artery disease',
-                'Values': '0: Upsloping, 1: Flat, 2: Downsloping',
-                'Range': '0-2'
-            },
-            {
-                'Feature': 'ca',
-                'Description': 'Number of major vessels colored by fluoroscopy',
-                'Impact': 'More blocked vessels indicate more severe coronary artery disease',
-                'Values': 'Numerical value (0-3)',
-                'Range': '0-3'
-            },
-            {
-                'Feature': 'thal',
-                'Description': 'Thalassemia (blood disorder) measurement',
-                'Impact': 'Specific patterns can indicate blood flow issues to the heart',
-                'Values': '1: Normal, 2: Fixed defect, 3: Reversible defect',
-                'Range': '1-3'
-            }
-        ]
+        # Input features data, generated from the schema the Predictor form and batch validation use
+        input_features = [feature_row(feature) for feature in FEATURE_COLUMNS]
         
         # Create DataFrame and display
         df_input = pd.DataFrame(input_features)
@@ -122,9 +111,12 @@ def show():
                 "Description": st.column_config.TextColumn("Description", width="medium"),
                 "Impact": st.column_config.TextColumn("Impact on Prediction", width="large"),
                 "Values": st.column_config.TextColumn("Values & Meaning", width="large"),
-                "Range": st.column_config.TextColumn("Typical Range", width="small")
+                "Range": st.column_config.TextColumn("Typical Range", width="small"),
+                "Accepted": st.column_config.TextColumn("Accepted Input", width="medium")
             }
         )
+        st.caption("Batch scoring and the inference server reject rows outside the accepted input "
+                   "before any model sees them.")
     
     with tab2:
         st.header("Output Feature (Prediction Target)")
@@ -184,14 +176,7 @@ def show():
     st.markdown("---")
     st.subheader("🎯 Quick Reference Guide")
     
-    st.markdown("""
-    **Most Important Predictive Features:**
-    - `thalach`: Maximum heart rate achieved (lower = higher risk)
-    - `exang`: Exercise-induced angina (presence = higher risk)  
-    - `cp`: Chest pain type (asymptomatic = higher risk)
-    - `oldpeak`: ST depression (higher = higher risk)
-    - `ca`: Number of blocked vessels (more = higher risk)
-    """)
+    show_feature_importance()
     
     # Clinical significance section
     st.markdown("---")
@@ -1,10 +1,159 @@
 # pages/EDA.py
+import functools
+import os
+import time
+
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+from core.dataset import source_fingerprint
+from core.eda import DENSITY_BINS, summarize_dataset, summarize_scatter
+
+# Point HFP_EDA_CSV at a larger patient registry; it is read in chunks, never whole
+DATA_PATH = os.environ.get('HFP_EDA_CSV', 'heart-disease.csv')
+
+# Computation and serving times per EDA artifact, shared by every session
+@st.cache_resource
+def artifact_timings():
+    return {}
+
+def eda_artifact(fn):
+    """Memoize fn(path, version, *args) on its own key and time every computation and serve
+
+    A widget change reruns the script, but only artifacts whose arguments
+    changed are recomputed; the rest are served from the cache.
+    """
+    @st.cache_data(show_spinner=False)
+    def compute(name, path, version, *args):
+        start = time.perf_counter()
+        result = fn(path, version, *args)
+        stats = artifact_timings().setdefault(name, {'computations': 0, 'serves': 0})
+        stats['computations'] += 1
+        stats['last compute (ms)'] = (time.perf_counter() - start) * 1000
+        return result
+    
+    @functools.wraps(fn)
+    def serve(path, version, *args):
+        start = time.perf_counter()
+        result = compute(fn.__name__, path, version, *args)
+        stats = artifact_timings().setdefault(fn.__name__, {'computations': 0, 'serves': 0})
+        stats['serves'] += 1
+        stats['last serve (ms)'] = (time.perf_counter() - start) * 1000
+        return result
+    return serve
+
+def histogram_figure(summary, column, title, nbins=30):
+    """Stacked per-target histogram with a box plot on top, drawn from aggregates"""
+    edges, counts = summary.histogram(column, nbins)
+    boxes = summary.box_stats(column)
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+    colors = px.colors.qualitative.Plotly
+    for color, label in zip(colors, counts.columns):
+        fig.add_trace(go.Box(
+            y=[label], orientation='h', name=label, legendgroup=label, showlegend=False,
+            marker_color=color, **{stat: [value] for stat, value in boxes[label].items()}
+        ), row=1, col=1)
+        fig.add_trace(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2, y=counts[label], width=edges[1:] - edges[:-1],
+            name=label, legendgroup=label, marker_color=color
+        ), row=2, col=1)
+    fig.update_layout(barmode='stack', bargap=0, title=title, legend_title_text='target')
+    fig.update_xaxes(title_text=column, row=2, col=1)
+    fig.update_yaxes(title_text='count', row=2, col=1)
+    return fig
+
+def density_figure(scatter, title):
+    """One 2-D count heatmap per colour class, sharing a colour scale"""
+    density = scatter.density()
+    x_centers = (scatter.x_edges[:-1] + scatter.x_edges[1:]) / 2
+    y_centers = (scatter.y_edges[:-1] + scatter.y_edges[1:]) / 2
+    fig = make_subplots(rows=1, cols=len(density), shared_yaxes=True,
+                        subplot_titles=[f"{scatter.color} = {label}" for label, _ in density])
+    for col, (label, counts) in enumerate(density, start=1):
+        # Empty cells stay transparent instead of taking the lowest colour
+        z = np.where(counts > 0, counts, np.nan)
+        fig.add_trace(go.Heatmap(z=z, x=x_centers, y=y_centers, coloraxis='coloraxis', name=label), row=1, col=col)
+        fig.update_xaxes(title_text=scatter.x, row=1, col=col)
+    fig.update_yaxes(title_text=scatter.y, row=1, col=1)
+    fig.update_layout(title=title, coloraxis={'colorscale': 'Viridis', 'colorbar': {'title': 'rows'}})
+    return fig
+
+# Every artifact is keyed by the dataset path and version (its size and modification time)
+@eda_artifact
+def dataset_summary(path, version):
+    return summarize_dataset(path)
+
+@eda_artifact
+def target_pie(path, version):
+    target_counts = dataset_summary(path, version).target_counts()
+    return px.pie(
+        values=target_counts.values, 
+        names=target_counts.index,
+        title='Distribution of Heart Disease Cases'
+    )
+
+@eda_artifact
+def gender_bar(path, version):
+    return px.bar(
+        dataset_summary(path, version).crosstab(), 
+        barmode='group',
+        title='Heart Disease Cases by Gender'
+    )
+
+@eda_artifact
+def feature_histogram(path, version, column, title, nbins=30):
+    return histogram_figure(dataset_summary(path, version), column, title, nbins)
+
+@eda_artifact
+def feature_describe(path, version, column):
+    return dataset_summary(path, version).describe(column)
+
+@eda_artifact
+def correlation_matrix(path, version):
+    return dataset_summary(path, version).corr()
+
+@eda_artifact
+def correlation_figure(path, version):
+    return px.imshow(
+        correlation_matrix(path, version),
+        text_auto=True,
+        aspect="auto",
+        title='Correlation Matrix of Numerical Features'
+    )
+
+@eda_artifact
+def target_correlation(path, version):
+    target_corr = correlation_matrix(path, version)['target'].drop('target').sort_values(ascending=False)
+    return pd.DataFrame({
+        'Feature': target_corr.index,
+        'Correlation with Target': target_corr.values
+    })
+
+# Scatter data for one axis/colour choice: density counts plus a stratified point sample
+@eda_artifact
+def scatter_data(path, version, x, y, color):
+    summary = dataset_summary(path, version)
+    return summarize_scatter(path, x, y, color,
+                             summary.histogram(x, DENSITY_BINS)[0], summary.histogram(y, DENSITY_BINS)[0])
+
+@eda_artifact
+def scatter_figure(path, version, x, y, color, style):
+    scatter = scatter_data(path, version, x, y, color)
+    if style == "Density":
+        return density_figure(scatter, f'{y} vs {x}')
+    return px.scatter(
+        scatter.labelled_points(),
+        x=x,
+        y=y,
+        color=color,
+        title=f'{y} vs {x}',
+        hover_data=['age']
+    )
+
 def show():
     st.title("📈 Exploratory Data Analysis")
     
@@ -13,25 +162,16 @@ def show():
     and understand relationships between different features.
     """)
     
-    # Load data
-    @st.cache_data
-    def load_data():
-        try:
-            df = pd.read_csv('heart-disease.csv')
-            return df
-        except FileNotFoundError:
-            st.error("heart-disease.csv file not found. Please make sure it's in the same directory.")
-            return pd.DataFrame()
-    
-    df = load_data()
-    
-    if df.empty:
+    # Aggregate the columnar copy in one streaming pass; recomputed when the file changes
+    try:
+        version = source_fingerprint(DATA_PATH)
+        summary = dataset_summary(DATA_PATH, version)
+    except FileNotFoundError:
+        st.error(f"{DATA_PATH} file not found. Please make sure it's in the same directory.")
         st.stop()
     
-    # Preprocess data for better visualization
-    df_processed = df.copy()
-    df_processed['sex'] = df_processed['sex'].map({0: 'Female', 1: 'Male'})
-    df_processed['target'] = df_processed['target'].map({0: 'No Disease', 1: 'Heart Disease'})
+    if not summary.n_rows:
+        st.stop()
     
     # Create tabs for different visualizations
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -48,34 +188,15 @@ def show():
         
         with col1:
             # Pie chart
-            target_counts = df_processed['target'].value_counts()
-            fig = px.pie(
-                values=target_counts.values, 
-                names=target_counts.index,
-                title='Distribution of Heart Disease Cases'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(target_pie(DATA_PATH, version), use_container_width=True)
         
         with col2:
             # Bar chart by gender
-            gender_target = pd.crosstab(df_processed['sex'], df_processed['target'])
-            fig = px.bar(
-                gender_target, 
-                barmode='group',
-                title='Heart Disease Cases by Gender'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(gender_bar(DATA_PATH, version), use_container_width=True)
         
         # Age distribution by target
         st.subheader("Age Distribution by Heart Disease Status")
-        fig = px.histogram(
-            df_processed, 
-            x='age', 
-            color='target',
-            marginal='box',
-            nbins=30,
-            title='Age Distribution by Heart Disease Status'
-        )
+        fig = feature_histogram(DATA_PATH, version, 'age', 'Age Distribution by Heart Disease Status', 30)
         st.plotly_chart(fig, use_container_width=True)
     
     with tab2:
@@ -83,58 +204,26 @@ def show():
         
         feature = st.selectbox(
             "Select a feature to visualize:",
-            options=[col for col in df.columns if col not in ['target', 'sex']]
+            options=[col for col in summary.columns if col not in ['target', 'sex']]
         )
         
         col1, col2 = st.columns(2)
         
         with col1:
-            if df[feature].dtype in ['int64', 'float64']:
-                fig = px.histogram(
-                    df_processed, 
-                    x=feature, 
-                    color='target',
-                    marginal='box',
-                    title=f'Distribution of {feature}'
-                )
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                fig = px.histogram(
-                    df_processed, 
-                    x=feature, 
-                    color='target',
-                    title=f'Distribution of {feature}'
-                )
-                st.plotly_chart(fig, use_container_width=True)
+            fig = feature_histogram(DATA_PATH, version, feature, f'Distribution of {feature}')
+            st.plotly_chart(fig, use_container_width=True)
                 
         with col2:
             st.subheader(f"Summary Statistics for {feature}")
-            if df[feature].dtype in ['int64', 'float64']:
-                st.dataframe(df[feature].describe())
-            else:
-                st.dataframe(df_processed[feature].value_counts())
+            st.dataframe(feature_describe(DATA_PATH, version, feature))
     
     with tab3:
         st.subheader("Correlation Matrix")
         
-        numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
-        corr_matrix = df[numeric_cols].corr()
-        
-        fig = px.imshow(
-            corr_matrix,
-            text_auto=True,
-            aspect="auto",
-            title='Correlation Matrix of Numerical Features'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(correlation_figure(DATA_PATH, version), use_container_width=True)
         
         st.subheader("Top Features Correlated with Heart Disease")
-        target_corr = corr_matrix['target'].drop('target').sort_values(ascending=False)
-        target_corr_df = pd.DataFrame({
-            'Feature': target_corr.index,
-            'Correlation with Target': target_corr.values
-        })
-        st.dataframe(target_corr_df)
+        st.dataframe(target_correlation(DATA_PATH, version))
     
     with tab4:
         st.subheader("Interactive Feature Relationships")
@@ -144,14 +233,14 @@ def show():
         with col1:
             x_feature = st.selectbox(
                 "Select X-axis feature:",
-                options=[col for col in df.columns if col != 'target'],
+                options=[col for col in summary.columns if col != 'target'],
                 index=0
             )
         
         with col2:
             y_feature = st.selectbox(
                 "Select Y-axis feature:",
-                options=[col for col in df.columns if col != 'target'],
+                options=[col for col in summary.columns if col != 'target'],
                 index=3
             )
         
@@ -161,12 +250,17 @@ def show():
             index=0
         )
         
-        fig = px.scatter(
-            df_processed,
-            x=x_feature,
-            y=y_feature,
-            color=color_by,
-            title=f'{y_feature} vs {x_feature}',
-            hover_data=['age']
-        )
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        style = st.radio("Show as:", options=["Points", "Density"], horizontal=True)
+        
+        # Only a bounded number of points or cells is sent to the browser, however large the data
+        fig = scatter_figure(DATA_PATH, version, x_feature, y_feature, color_by, style)
+        st.plotly_chart(fig, use_container_width=True)
+        scatter = scatter_data(DATA_PATH, version, x_feature, y_feature, color_by)
+        if style == "Points" and len(scatter.points) < scatter.n_rows:
+            st.caption(f"Showing {len(scatter.points):,} of {scatter.n_rows:,} rows: up to "
+                       f"{scatter.per_stratum} per region and class, so sparse regions and outliers "
+                       f"are always drawn. Use Density to compare how crowded regions are.")
+    
+    with st.expander("⏱️ EDA artifact timings"):
+        st.caption("Each artifact is computed once per dataset version and argument set, then served from cache.")
+        st.dataframe(pd.DataFrame(artifact_timings()).T)
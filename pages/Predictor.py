@@ -1,24 +1,162 @@
 # predictor_page.py
+import hashlib
+import os
+import tempfile
+
 import streamlit as st
-import pickle
 import pandas as pd
 import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from core.artifacts import MANIFEST_NAME, LazyModels
+from core.attributions import make_explainers
+from core.batch import predict_matrix, stage_timer, write_csv
+from core.cache import DEFAULT_MAXSIZE, PredictionCache
+from core.coalescer import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, coalesce_models
+from core.dataset import load_dataset
+from core.ensemble import EnsembleExecutor
+from core.features import FEATURE_COLUMNS, FEATURE_SCHEMA
+from core.lookup import LookupTable, TableModel
+from core.metrics import serve_metrics
+from core.models import ENGINES, engine_choices, is_approximate, model_signature
+from core.registry import DEFAULT_POLL_INTERVAL, ModelRegistry
+from core.whatif import sweep_1d, sweep_2d
+
+# Set HFP_COALESCE=1 to merge concurrent single-row predictions across sessions
+COALESCE = os.environ.get('HFP_COALESCE') == '1'
+
+# Set HFP_ARTIFACTS=Data/arrays to serve converted array artifacts, each loaded on first use
+ARTIFACTS = os.environ.get('HFP_ARTIFACTS')
+
+# Set HFP_LOOKUP=Data/lookup to answer on-grid inputs from precomputed risk tables
+LOOKUP = os.environ.get('HFP_LOOKUP')
+
+# Prediction cache size, optional TTL (seconds) and optional SQLite file for the on-disk tier
+CACHE_SIZE = int(os.environ.get('HFP_CACHE_SIZE', DEFAULT_MAXSIZE))
+CACHE_TTL = float(os.environ['HFP_CACHE_TTL']) if os.environ.get('HFP_CACHE_TTL') else None
+CACHE_DB = os.environ.get('HFP_CACHE_DB')
+
+# Seconds each model may take when "All Models" runs them in parallel
+ENSEMBLE_TIMEOUT = float(os.environ.get('HFP_ENSEMBLE_TIMEOUT', 30))
+
+# Set HFP_METRICS_PORT=9100 to expose Prometheus metrics at http://127.0.0.1:9100/metrics
+METRICS_PORT = int(os.environ['HFP_METRICS_PORT']) if os.environ.get('HFP_METRICS_PORT') else None
+
+# Seconds between checks for a newly published model version; 0 disables hot reload
+RELOAD_INTERVAL = float(os.environ.get('HFP_RELOAD_INTERVAL', DEFAULT_POLL_INTERVAL))
 
-# Load the saved models with caching
+def artifacts_label():
+    """Version label of the array artifacts, bumped whenever the manifest is rewritten"""
+    return f"artifacts-{os.stat(os.path.join(ARTIFACTS, MANIFEST_NAME)).st_mtime_ns}"
+
+# One metrics endpoint per process, started with the page
+@st.cache_resource
+def start_metrics_server():
+    return serve_metrics(METRICS_PORT) if METRICS_PORT else None
+
+# One registry per engine selection; it swaps in new model versions without a restart
 @st.cache_resource
-def load_models():
-    models = {}
+def load_registry(engines=()):
     try:
-        with open('Data/logistic_regression_model.pkl', 'rb') as file:
-            models['Logistic Regression'] = pickle.load(file)
-        with open('Data/random_forest_model.pkl', 'rb') as file:
-            models['Random Forest'] = pickle.load(file)
-        with open('Data/knn_model.pkl', 'rb') as file:
-            models['K-Nearest Neighbors'] = pickle.load(file)
+        if ARTIFACTS:
+            return ModelRegistry(lambda: LazyModels(ARTIFACTS), artifacts_label, poll_interval=RELOAD_INTERVAL)
+        return ModelRegistry.for_data_dir(engines=dict(engines), poll_interval=RELOAD_INTERVAL)
     except FileNotFoundError as e:
         st.error(f"Model file not found: {e}")
+        return None
+
+def with_lookup(table, model_name, model):
+    """model wrapped in a TableModel, unless its table is missing or was built for another version"""
+    if model_name not in table.tables:
+        return model
+    try:
+        return TableModel(table, model_name, model, model_signature(model_name))
+    except ValueError as e:
+        st.warning(f"⚠️ Lookup table not used: {e}")
+        return model
+
+def close_models(models):
+    """Stop the micro-batching threads of one version's serving wrappers"""
+    if COALESCE:
+        for model in models.values():
+            model.close()
+
+def models_open(models):
+    return not COALESCE or not any(model.closed for model in models.values())
+
+# Serving wrappers for one model version; old versions age out of the cache, and their batcher threads
+# stop when the registry retires the version
+@st.cache_resource(max_entries=4, on_release=close_models, validate=models_open)
+def load_models(engines=(), version=None, _models=None):
+    models = _models
+    if LOOKUP:
+        table = LookupTable(LOOKUP)
+        models = {model_name: with_lookup(table, model_name, model) for model_name, model in models.items()}
+    if COALESCE:
+        models = coalesce_models(
+            models,
+            max_batch_size=int(os.environ.get('HFP_COALESCE_MAX_BATCH', DEFAULT_MAX_BATCH_SIZE)),
+            max_wait_ms=float(os.environ.get('HFP_COALESCE_MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS))
+        )
+        for model in models.values():
+            load_registry(engines).attach(version, model)
     return models
 
+# One thread pool per engine selection and model version, shared by every session; closed with the version
+@st.cache_resource(max_entries=4, on_release=EnsembleExecutor.close, validate=lambda executor: not executor.closed)
+def load_ensemble(engines=(), version=None, _models=None):
+    executor = EnsembleExecutor(load_models(engines, version, _models), timeout=ENSEMBLE_TIMEOUT)
+    load_registry(engines).attach(version, executor)
+    return executor
+
+# Explainers for one model version; the logistic baseline is the average patient in heart-disease.csv
+@st.cache_resource(max_entries=4)
+def load_explainers(engines=(), version=None, _models=None):
+    try:
+        background = load_dataset('heart-disease.csv', columns=FEATURE_COLUMNS).to_numpy(dtype=np.float64)
+    except FileNotFoundError:
+        background = None
+    return make_explainers(_models, background)
+
+# Shared by every session in this process
+@st.cache_resource
+def load_prediction_cache():
+    return PredictionCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL, disk_path=CACHE_DB)
+
+def warm_up():
+    """Load the registry and serving wrappers the page starts with, before anyone opens it"""
+    engines = () if ARTIFACTS else tuple((model_name, engine_choices(model_name)[0]) for model_name in ENGINES)
+    registry = load_registry(engines)
+    if registry is not None:
+        with registry.lease() as (version, base_models):
+            load_models(engines, version, base_models)
+    load_prediction_cache()
+
+def model_identity(model_name, engines):
+    """Cache name of a model under the selected engine"""
+    if ARTIFACTS:
+        return f"{model_name} [artifacts]"
+    return f"{model_name} [{dict(engines).get(model_name, 'sklearn')}]"
+
+def feature_input(feature):
+    """Form control for one feature, generated from its FEATURE_SCHEMA entry"""
+    spec = FEATURE_SCHEMA[feature]
+    if 'codes' in spec:
+        options = list(spec['codes'])
+        return st.selectbox(spec['label'], options=options, index=options.index(spec['default']),
+                            format_func=spec['codes'].get, help=spec['help'])
+    return st.slider(spec['label'], min_value=spec['min'], max_value=spec['max'], value=spec['default'],
+                     step=spec.get('step'), help=spec['help'])
+
+def engine_selectbox(model_name, approximate):
+    """Engine picker for one model, with approximate engines labelled as such"""
+    def label(engine):
+        return f"{engine} (approximate, predictions differ)" if is_approximate(model_name, engine) else engine
+    return st.selectbox(f"**{model_name}**", options=engine_choices(model_name, approximate=approximate),
+                        format_func=label)
+
 def show():
     st.title("❤️ Heart Disease Risk Assessment")
     st.markdown("Complete the form below to analyze your heart disease risk using advanced AI models.")
@@ -33,21 +171,10 @@ def show():
         col1, col2 = st.columns(2)
         
         with col1:
-            age = st.slider(
-                "**Age**",
-                min_value=20,
-                max_value=100,
-                value=50,
-                help="Age of the patient in years"
-            )
+            age = feature_input('age')
         
         with col2:
-            sex = st.selectbox(
-                "**Gender**",
-                options=[0, 1],
-                format_func=lambda x: "Female" if x == 0 else "Male",
-                help="0 = Female, 1 = Male"
-            )
+            sex = feature_input('sex')
         
         st.markdown("<br>", unsafe_allow_html=True)  # Add space
         
@@ -58,60 +185,14 @@ def show():
         col3, col4 = st.columns(2)
         
         with col3:
-            cp = st.selectbox(
-                "**Chest Pain Type**",
-                options=[0, 1, 2, 3],
-                format_func=lambda x: {
-                    0: "Typical Angina",
-                    1: "Atypical Angina", 
-                    2: "Non-anginal Pain",
-                    3: "Asymptomatic"
-                }[x],
-                help="Type of chest pain experienced"
-            )
-            
-            trestbps = st.slider(
-                "**Resting Blood Pressure** (mm Hg)",
-                min_value=90,
-                max_value=200,
-                value=120,
-                help="Resting blood pressure measurement"
-            )
-            
-            chol = st.slider(
-                "**Cholesterol Level** (mg/dl)",
-                min_value=100,
-                max_value=600,
-                value=250,
-                help="Serum cholesterol level"
-            )
+            cp = feature_input('cp')
+            trestbps = feature_input('trestbps')
+            chol = feature_input('chol')
         
         with col4:
-            fbs = st.selectbox(
-                "**Fasting Blood Sugar** > 120 mg/dl",
-                options=[0, 1],
-                format_func=lambda x: "No (≤120 mg/dl)" if x == 0 else "Yes (>120 mg/dl)",
-                help="Fasting blood sugar level"
-            )
-            
-            restecg = st.selectbox(
-                "**Resting ECG Results**",
-                options=[0, 1, 2],
-                format_func=lambda x: {
-                    0: "Normal",
-                    1: "ST-T Wave Abnormality",
-                    2: "Left Ventricular Hypertrophy"
-                }[x],
-                help="Resting electrocardiographic results"
-            )
-            
-            thalach = st.slider(
-                "**Max Heart Rate Achieved**",
-                min_value=70,
-                max_value=220,
-                value=150,
-                help="Maximum heart rate during exercise"
-            )
+            fbs = feature_input('fbs')
+            restecg = feature_input('restecg')
+            thalach = feature_input('thalach')
         
         st.markdown("<br><br>", unsafe_allow_html=True)  # Add more space
         
@@ -122,41 +203,12 @@ def show():
         col5, col6 = st.columns(2)
         
         with col5:
-            exang = st.selectbox(
-                "**Exercise-Induced Angina**",
-                options=[0, 1],
-                format_func=lambda x: "No" if x == 0 else "Yes",
-                help="Chest pain during exercise"
-            )
-            
-            oldpeak = st.slider(
-                "**ST Depression** (Oldpeak)",
-                min_value=0.0,
-                max_value=6.2,
-                value=1.0,
-                step=0.1,
-                help="ST depression induced by exercise"
-            )
+            exang = feature_input('exang')
+            oldpeak = feature_input('oldpeak')
         
         with col6:
-            slope = st.selectbox(
-                "**Slope of ST Segment**",
-                options=[0, 1, 2],
-                format_func=lambda x: {
-                    0: "Upsloping",
-                    1: "Flat", 
-                    2: "Downsloping"
-                }[x],
-                help="Slope of peak exercise ST segment"
-            )
-            
-            ca = st.slider(
-                "**Number of Major Vessels**",
-                min_value=0,
-                max_value=3,
-                value=1,
-                help="Number of major vessels colored by fluoroscopy (0-3)"
-            )
+            slope = feature_input('slope')
+            ca = feature_input('ca')
         
         st.markdown("<br>", unsafe_allow_html=True)  # Add space
         
@@ -164,16 +216,7 @@ def show():
         st.header("📋 Additional Information")
         st.markdown("---")
         
-        thal = st.selectbox(
-            "**Thalassemia Result**",
-            options=[1, 2, 3],
-            format_func=lambda x: {
-                1: "Normal",
-                2: "Fixed Defect",
-                3: "Reversible Defect"
-            }[x],
-            help="Thalassemia test results"
-        )
+        thal = feature_input('thal')
         
         st.markdown("<br>", unsafe_allow_html=True)  # Add space
         
@@ -187,8 +230,20 @@ def show():
     
     st.markdown("<br>", unsafe_allow_html=True)  # Space between form and prediction buttons
     
-    # Load models
-    models = load_models()
+    # Load models with the selected inference engines
+    with st.expander("⚙️ Inference Engines"):
+        if ARTIFACTS:
+            st.markdown(f"Engines are fixed by the array artifacts in `{ARTIFACTS}`.")
+            engines = ()
+        else:
+            st.markdown("Faster engines give the same predictions as the scikit-learn models.")
+            approximate = st.checkbox("Also offer approximate engines",
+                                      help="Approximate engines are a different model and can change predictions")
+            engines = tuple((model_name, engine_selectbox(model_name, approximate)) for model_name in ENGINES)
+    registry = load_registry(engines)
+    if registry is None:
+        return
+    start_metrics_server()
     
     # Prediction buttons section
     st.header("🔍 Make Prediction")
@@ -200,35 +255,31 @@ def show():
     col7, col8, col9, col10 = st.columns(4)
     
     predictions = {}
+    timings = {}
+    answered_by = {}
+    features = [age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal]
     
     with col7:
         if st.button("🤖 Logistic Regression", use_container_width=True, type="primary"):
-            predictions['Logistic Regression'] = make_prediction(models['Logistic Regression'], 
-                                                               age, sex, cp, trestbps, chol, fbs, 
-                                                               restecg, thalach, exang, oldpeak, 
-                                                               slope, ca, thal)
+            predictions['Logistic Regression'], answered_by['Logistic Regression'] = cached_prediction(registry, engines,
+                                                                 'Logistic Regression', features)
     
     with col8:
         if st.button("🌲 Random Forest", use_container_width=True, type="primary"):
-            predictions['Random Forest'] = make_prediction(models['Random Forest'], 
-                                                         age, sex, cp, trestbps, chol, fbs, 
-                                                         restecg, thalach, exang, oldpeak, 
-                                                         slope, ca, thal)
+            predictions['Random Forest'], answered_by['Random Forest'] = cached_prediction(registry, engines,
+                                                                 'Random Forest', features)
     
     with col9:
         if st.button("📏 K-Nearest Neighbors", use_container_width=True, type="primary"):
-            predictions['K-Nearest Neighbors'] = make_prediction(models['K-Nearest Neighbors'], 
-                                                               age, sex, cp, trestbps, chol, fbs, 
-                                                               restecg, thalach, exang, oldpeak, 
-                                                               slope, ca, thal)
+            predictions['K-Nearest Neighbors'], answered_by['K-Nearest Neighbors'] = cached_prediction(registry, engines,
+                                                                 'K-Nearest Neighbors', features)
     
     with col10:
         if st.button("🎯 All Models", use_container_width=True, type="secondary"):
-            for model_name, model in models.items():
-                predictions[model_name] = make_prediction(model, 
-                                                         age, sex, cp, trestbps, chol, fbs, 
-                                                         restecg, thalach, exang, oldpeak, 
-                                                         slope, ca, thal)
+            predictions, timings, failures, version = predict_all(registry, engines, features)
+            answered_by = dict.fromkeys(predictions, version)
+            for model_name, error in failures.items():
+                st.error(f"Error making prediction with {model_name}: {error}")
     
     # Display predictions with better spacing
     if predictions:
@@ -253,36 +304,263 @@ def show():
                 with col12:
                     st.metric("Confidence", f"{confidence:.1%}")
                 
+                st.caption(f"Answered by model version `{answered_by[model_name]}`")
+                
                 st.markdown("---")
         
         # Show overall consensus if multiple models were used
         if len(predictions) > 1:
             st.markdown("<br>", unsafe_allow_html=True)
             show_final_assessment(predictions)
+        
+        if timings:
+            show_timings(timings)
+        
+        show_attributions(registry, engines, list(predictions), features)
+    
+    st.markdown("<br><br>", unsafe_allow_html=True)
+    show_what_if(registry, engines, features)
+    
+    st.markdown("<br><br>", unsafe_allow_html=True)
+    show_batch_scoring(registry, engines)
+    
+    with st.expander("🔄 Model registry"):
+        st.json(registry.status())
+    
+    with st.expander("🗃️ Prediction cache statistics"):
+        st.json(load_prediction_cache().stats())
+    
+    if COALESCE:
+        with st.expander("⏱️ Micro-batching statistics"), registry.lease() as (version, base_models):
+            for model_name, model in load_models(engines, version, base_models).items():
+                st.markdown(f"**{model_name}**")
+                st.json(model.stats())
 
-def make_prediction(model, age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal):
-    """Make prediction using the given model"""
+def make_prediction(model, age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal,
+                    model_name=None):
+    """Make prediction using the given model, recording metrics under model_name"""
     try:
         # Create input array in the correct order
-        input_data = np.array([[age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal]])
+        with stage_timer(model_name, 'build_input'):
+            input_data = np.array([[age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal]])
         
-        # Make prediction
-        prediction = model.predict(input_data)[0]
+        # One predict_proba call gives the class, the risk and the confidence
+        predictions, probabilities, confidences = predict_matrix(model, input_data, model_name)
         
-        # Get prediction probabilities
-        prediction_proba = model.predict_proba(input_data)[0]
+        return predictions[0], probabilities[0], confidences[0]
         
-        # Get confidence (max probability)
-        confidence = max(prediction_proba)
+    except Exception as e:
+        st.error(f"Error making prediction: {e}")
+        return None, None, None
+
+def cached_prediction(registry, engines, model_name, features):
+    """make_prediction for one model, answered from the shared cache when possible
+
+    Returns the result and the model version that answered it.
+    """
+    cache = load_prediction_cache()
+    cache_name = model_identity(model_name, engines)
+    with registry.lease() as (version, base_models):
+        result = cache.get(cache_name, version, features)
+        if result is None:
+            models = load_models(engines, version, base_models)
+            result = make_prediction(models[model_name], *features, model_name=model_name)
+            if result[0] is not None:
+                cache.put(cache_name, version, features, result)
+        registry.record(version, model_name)
+    return result, version
+
+def predict_all(registry, engines, features):
+    """Score every model, running the cache misses in parallel on the ensemble executor"""
+    cache = load_prediction_cache()
+    with registry.lease() as (version, base_models):
+        identities = {model_name: model_identity(model_name, engines) for model_name in base_models}
         
-        # Get the probability of heart disease (class 1)
-        heart_disease_prob = prediction_proba[1]
+        cached = {}
+        for model_name, cache_name in identities.items():
+            result = cache.get(cache_name, version, features)
+            if result is not None:
+                cached[model_name] = result
         
-        return prediction, heart_disease_prob, confidence
+        # Run every missing model at once so the wait is the slowest model, not the sum
+        missing = [model_name for model_name in identities if model_name not in cached]
+        results, timings, failures = {}, {}, {}
+        if missing:
+            executor = load_ensemble(engines, version, base_models)
+            results, timings, failures = executor.run_single(features, missing)
+            for model_name, result in results.items():
+                cache.put(identities[model_name], version, features, result)
         
+        predictions = {
+            model_name: cached.get(model_name, results.get(model_name))
+            for model_name in identities
+            if model_name in cached or model_name in results
+        }
+        for model_name in predictions:
+            registry.record(version, model_name)
+    return predictions, timings, failures, version
+
+def show_attributions(registry, engines, model_names, features):
+    """Per-feature contributions to this patient's result for each model that answered"""
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.subheader("🧭 Why This Prediction?")
+    
+    X = np.array([features], dtype=np.float64)
+    with registry.lease() as (version, base_models):
+        explainers = load_explainers(engines, version, base_models)
+        attributions = {model_name: explainers[model_name].explain(X) for model_name in model_names}
+    
+    cols = st.columns(len(attributions))
+    for col, (model_name, attribution) in zip(cols, attributions.items()):
+        with col:
+            contributions = attribution.row(0).iloc[::-1]
+            fig = px.bar(x=contributions.values, y=contributions.index, orientation='h',
+                         color=np.where(contributions.values > 0, 'raises risk', 'lowers risk'),
+                         color_discrete_map={'raises risk': '#d62728', 'lowers risk': '#2ca02c'},
+                         labels={'x': f'Contribution ({attribution.units})', 'y': '', 'color': ''},
+                         title=model_name)
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"Baseline {attribution.base[0]:.3f} + contributions = {attribution.output[0]:.3f} "
+                       f"({attribution.units})")
+    st.caption("Logistic Regression: exact terms relative to the average patient. Random Forest: changes in "
+               "risk along each tree's decision path. K-Nearest Neighbors: each neighbour's vote, credited to "
+               f"the features that make it similar. Explained with model version `{version}`.")
+
+def show_what_if(registry, engines, features):
+    """Sweep one or two features over their form range for the current patient, one call per model"""
+    st.header("🔬 What-If Analysis")
+    st.markdown("See how the risk changes as one or two measurements move across their whole range, "
+                "with every other value kept as entered above.")
+    
+    mode = st.radio("**Sweep**", options=["One feature", "Two features"], horizontal=True)
+    col_x, col_y = st.columns(2)
+    with col_x:
+        x_feature = st.selectbox("**Feature**", options=FEATURE_COLUMNS, index=FEATURE_COLUMNS.index('chol'))
+    y_feature = None
+    if mode == "Two features":
+        with col_y:
+            y_options = [col for col in FEATURE_COLUMNS if col != x_feature]
+            y_feature = st.selectbox("**Second feature**", options=y_options, index=y_options.index('thalach')
+                                     if 'thalach' in y_options else 0)
+    
+    if not st.button("📈 Run What-If Sweep"):
+        return
+    
+    with registry.lease() as (version, base_models):
+        executor = load_ensemble(engines, version, base_models)
+        if y_feature is None:
+            curves, failures = sweep_1d(base_models, features, x_feature, executor=executor)
+            registry.record(version, 'what-if', rows=len(curves) * len(curves.columns))
+        else:
+            x_values, y_values, surfaces, failures = sweep_2d(base_models, features, x_feature, y_feature,
+                                                              executor=executor)
+            registry.record(version, 'what-if', rows=len(x_values) * len(y_values) * len(surfaces))
+    for model_name, error in failures.items():
+        st.error(f"Error sweeping {model_name}: {error}")
+    
+    current_x = features[FEATURE_COLUMNS.index(x_feature)]
+    if y_feature is None:
+        fig = px.line(curves, labels={'value': 'Risk probability', 'variable': 'Model'},
+                      title=f'Heart disease risk across {x_feature}')
+        fig.add_vline(x=current_x, line_dash='dash', annotation_text='current')
+        fig.update_yaxes(tickformat='.0%', range=[0, 1])
+        st.plotly_chart(fig, use_container_width=True)
+    elif surfaces:
+        current_y = features[FEATURE_COLUMNS.index(y_feature)]
+        fig = make_subplots(rows=1, cols=len(surfaces), shared_yaxes=True, subplot_titles=list(surfaces))
+        for col, surface in enumerate(surfaces.values(), start=1):
+            fig.add_trace(go.Heatmap(z=surface, x=x_values, y=y_values, coloraxis='coloraxis'), row=1, col=col)
+            fig.add_trace(go.Scatter(x=[current_x], y=[current_y], mode='markers', showlegend=False,
+                                     marker={'symbol': 'x', 'color': 'white', 'size': 10}), row=1, col=col)
+            fig.update_xaxes(title_text=x_feature, row=1, col=col)
+        fig.update_yaxes(title_text=y_feature, row=1, col=1)
+        fig.update_layout(title=f'Heart disease risk across {x_feature} and {y_feature}',
+                          coloraxis={'colorscale': 'RdYlGn_r', 'cmin': 0, 'cmax': 1,
+                                     'colorbar': {'title': 'Risk', 'tickformat': '.0%'}})
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"One batched call per model, answered by model version `{version}`. The ✕ or dashed line marks "
+               f"the patient as entered.")
+
+def remove_scored_file(cohort):
+    os.remove(cohort['path'])
+
+# Scored cohorts keyed by the upload's content, model version, engines and explain setting, so reruns and
+# other sessions reuse the file; it is written chunk by chunk and read back only for a download
+@st.cache_resource(max_entries=8, on_release=remove_scored_file, show_spinner="Scoring cohort...")
+def score_cohort(digest, engines, version, explain, _uploaded, _registry, _base_models):
+    models = load_models(engines, version, _base_models)
+    executor = load_ensemble(engines, version, _base_models)
+    explainers = load_explainers(engines, version, _base_models) if explain else None
+    descriptor, path = tempfile.mkstemp(prefix='hfp-scored-', suffix='.csv')
+    os.close(descriptor)
+    rejects = []
+    try:
+        _uploaded.seek(0)
+        rows = write_csv(models, _uploaded, path, executor=executor, explainers=explainers, rejects=rejects)
+    except Exception:
+        os.remove(path)
+        raise
+    for model_name in models:
+        _registry.record(version, model_name, rows=rows)
+    return {'path': path, 'rows': rows, 'rejects': rejects}
+
+def show_batch_scoring(registry, engines):
+    """Score an uploaded CSV cohort with every model in one call per model"""
+    st.header("📂 Batch Scoring")
+    st.markdown("Upload a CSV with the same columns as `heart-disease.csv` to score a whole cohort at once.")
+    
+    uploaded = st.file_uploader("**Patient cohort (CSV)**", type="csv")
+    explain = st.checkbox("Include per-feature contributions for every patient")
+    if uploaded is None:
+        return
+    
+    digest = hashlib.sha256(uploaded.getvalue()).hexdigest()
+    try:
+        with registry.lease() as (version, base_models):
+            cohort = score_cohort(digest, engines, version, explain, uploaded, registry, base_models)
     except Exception as e:
-        st.error(f"Error making prediction: {e}")
-        return None, None, None
+        st.error(f"Error scoring cohort: {e}")
+        return
+    
+    if cohort['rejects']:
+        show_rejected_rows(cohort['rejects'])
+    st.success(f"✅ Cohort scored successfully with model version `{version}`!")
+    st.download_button(
+        "⬇️ Download Predictions",
+        data=lambda: read_file(cohort['path']),
+        file_name="heart_disease_predictions.csv",
+        mime="text/csv"
+    )
+
+def read_file(path):
+    with open(path, 'rb') as file:
+        return file.read()
+
+def show_rejected_rows(rejects):
+    """Summarise the rows that failed schema validation and were left out of the scores"""
+    counts = pd.concat([report.counts for report in rejects]).groupby(level=['feature', 'problem']).sum()
+    st.warning(f"⚠️ {sum(report.n_invalid for report in rejects):,} rows were not scored because they "
+               f"failed validation: {'; '.join(f'{feature} {problem} ({count:,})' for (feature, problem), count in counts.items())}")
+    violations = pd.concat([report.violations for report in rejects], ignore_index=True)
+    st.dataframe(violations, hide_index=True)
+    st.download_button(
+        "⬇️ Download Rejected Rows Report",
+        data=violations.to_csv(index=False),
+        file_name="heart_disease_rejected_rows.csv",
+        mime="text/csv"
+    )
+
+def show_timings(timings):
+    """Show how long each model took so the bottleneck is visible"""
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.subheader("⏱️ Model Timings")
+    
+    slowest = max(timings, key=timings.get)
+    timing_cols = st.columns(len(timings))
+    for col, (model_name, seconds) in zip(timing_cols, timings.items()):
+        with col:
+            st.metric(model_name, f"{seconds * 1000:.1f} ms")
+    st.caption(f"Slowest model: **{slowest}**. Running in parallel, the total wait is close to its time.")
 
 def show_final_assessment(predictions):
     """Show final assessment when multiple models are used"""
@@ -0,0 +1,2 @@
+# scripts/__init__.py
+"""Command-line tools, run from the repository root with python -m scripts.<name>"""
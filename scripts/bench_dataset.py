@@ -0,0 +1,74 @@
+# scripts/bench_dataset.py
+"""Compare loading a dataset from CSV against its columnar Parquet cache
+
+Each load runs in a fresh process so its resident memory is measured alone.
+
+Run with:  python -m scripts.bench_dataset --sizes 300 1000000 10000000
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.dataset import ensure_columnar, load_dataset
+
+
+def write_rows(csv_path, n_rows, out_path, seed=0):
+    """Resample heart-disease.csv rows up to n_rows and write them as CSV"""
+    df = pd.read_csv(csv_path)
+    rng = np.random.default_rng(seed)
+    df.iloc[rng.integers(0, len(df), n_rows)].to_csv(out_path, index=False)
+
+
+def rss_mb():
+    # Second field of /proc/self/statm is the resident set in pages (Linux only)
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def timed_load(kind, path, cache_dir, queue):
+    baseline = rss_mb()
+    start = time.perf_counter()
+    df = pd.read_csv(path) if kind == 'csv' else load_dataset(path, cache_dir=cache_dir)
+    seconds = time.perf_counter() - start
+    queue.put((seconds, rss_mb() - baseline, df.memory_usage(deep=True).sum() / 2**20))
+
+
+def measure(kind, path, cache_dir):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=timed_load, args=(kind, path, cache_dir, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the columnar dataset cache")
+    parser.add_argument('--csv', default='heart-disease.csv')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[300, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'format':>8} {'file MB':>8} {'load s':>8} {'RSS MB':>8} {'frame MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.sizes:
+            csv_path = os.path.join(tmp, f"rows_{n_rows}.csv")
+            write_rows(args.csv, n_rows, csv_path)
+            start = time.perf_counter()
+            parquet_path = ensure_columnar(csv_path, cache_dir=tmp)
+            convert = time.perf_counter() - start
+
+            for kind, path in (('csv', csv_path), ('parquet', parquet_path)):
+                seconds, rss, frame = measure(kind, csv_path, tmp)
+                size = os.path.getsize(path) / 2**20
+                print(f"{n_rows:>10} {kind:>8} {size:>8.1f} {seconds:>8.3f} {rss:>8.1f} {frame:>9.1f}")
+            print(f"{'':>10} one-time conversion: {convert:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# scripts/bench_forest.py
+"""Compare the flat-array forest evaluator against sklearn's predict_proba
+
+"flat" is the engine as served, which hands batches of SKLEARN_MIN_ROWS or
+more to sklearn; "walk" always walks the arrays, as a forest loaded from
+array artifacts does.
+
+Run with:  python -m scripts.bench_forest --sizes 1 1000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.batch import to_matrix
+from core.forest import SKLEARN_MIN_ROWS, FlatForest
+from core.models import load_model_files
+
+
+def synthetic_rows(csv_path, n_rows, seed=0):
+    """Resample heart-disease.csv rows up to n_rows"""
+    X = to_matrix(pd.read_csv(csv_path))
+    rng = np.random.default_rng(seed)
+    return X[rng.integers(0, len(X), n_rows)]
+
+
+def best_time(fn, X, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(X)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the flat Random Forest engine")
+    parser.add_argument('--csv', default='heart-disease.csv')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 1_000, 1_000_000])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    forest = load_model_files()['Random Forest']
+    start = time.perf_counter()
+    flat = FlatForest.from_sklearn(forest)
+    walk = FlatForest.from_arrays(*flat.to_arrays())
+    print(f"Export: {flat.n_trees} trees, {len(flat.threshold)} nodes, "
+          f"{flat.nbytes / 1024:.0f} KB in {(time.perf_counter() - start) * 1000:.1f} ms; "
+          f"sklearn scores batches from {SKLEARN_MIN_ROWS:,} rows\n")
+
+    print(f"{'rows':>10} {'sklearn ms':>12} {'flat ms':>10} {'speedup':>8} {'walk ms':>10} {'max |diff|':>11}")
+    for n_rows in args.sizes:
+        X = synthetic_rows(args.csv, n_rows)
+        repeats = args.repeats if n_rows < 100_000 else 1
+        sklearn_time, expected = best_time(forest.predict_proba, X, repeats)
+        flat_time, _ = best_time(flat.predict_proba, X, repeats)
+        walk_time, actual = best_time(walk.predict_proba, X, repeats)
+        print(f"{n_rows:>10} {sklearn_time * 1000:>12.2f} {flat_time * 1000:>10.2f} "
+              f"{sklearn_time / flat_time:>7.1f}x {walk_time * 1000:>10.2f} {np.abs(expected - actual).max():>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
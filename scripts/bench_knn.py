@@ -0,0 +1,58 @@
+# scripts/bench_knn.py
+"""Benchmark the indexed KNN engine as the reference set grows
+
+Run with:  python -m scripts.bench_knn --references 303 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.batch import to_matrix
+from core.features import TARGET_COLUMN
+from core.models import load_model_files
+from core.neighbors import IndexedKNN
+
+
+def synthetic_reference(df, n_rows, rng):
+    """Resample labelled rows and jitter the continuous features"""
+    rows = df.iloc[rng.integers(0, len(df), n_rows)]
+    X = to_matrix(rows)
+    for col in (0, 3, 4, 7):  # age, trestbps, chol, thalach
+        X[:, col] += rng.normal(0, 2, n_rows)
+    X[:, 9] = np.clip(X[:, 9] + rng.normal(0, 0.1, n_rows), 0, None)  # oldpeak
+    return X, rows[TARGET_COLUMN].to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KD-tree / ball-tree KNN engines")
+    parser.add_argument('--csv', default='heart-disease.csv')
+    parser.add_argument('--references', type=int, nargs='+', default=[303, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=1_000)
+    parser.add_argument('--index', choices=['kd_tree', 'ball_tree'], default='kd_tree')
+    parser.add_argument('--scale', action='store_true', help="Use the standardised feature space")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = pd.read_csv(args.csv)
+    model = load_model_files()['K-Nearest Neighbors']
+    queries, _ = synthetic_reference(df, args.queries, rng)
+
+    print(f"{'reference':>10} {'build s':>8} {'index MB':>9} {'query ms':>9} {'us/row':>8}")
+    for n_rows in args.references:
+        X, y = synthetic_reference(df, n_rows, rng)
+        start = time.perf_counter()
+        knn = IndexedKNN(X, y, model.classes_, n_neighbors=model.n_neighbors, p=model.p,
+                         weights=model.weights, index=args.index, scale=args.scale)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        knn.predict_proba(queries)
+        query = time.perf_counter() - start
+        print(f"{n_rows:>10} {build:>8.2f} {knn.nbytes / 2**20:>9.1f} "
+              f"{query * 1000:>9.1f} {query / args.queries * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
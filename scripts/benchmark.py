@@ -0,0 +1,206 @@
+# scripts/benchmark.py
+"""Benchmark the models and data paths, and compare two runs for regressions
+
+Every result is a single number with a unit and a direction, written to JSON
+so runs from before and after an upgrade or a retrain can be compared.
+
+Run with:  python -m scripts.benchmark run --out before.json
+           python -m scripts.benchmark compare before.json after.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from core.batch import predict_matrix
+from core.eda import summarize_csv
+from core.ensemble import EnsembleExecutor
+from core.forest import FlatForest
+from core.models import DATA_DIR, MODEL_FILES, load_model_files, model_signature
+from pages.Predictor import make_prediction
+from scripts.bench_dataset import write_rows
+from scripts.bench_forest import synthetic_rows
+
+
+def percentile_ms(times, q):
+    return float(np.percentile(times, q) * 1000)
+
+
+def repeat(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def result(value, unit, better='lower', **extra):
+    return {'value': value, 'unit': unit, 'better': better, **extra}
+
+
+def bench_model_load(data_dir, repeats):
+    times = repeat(lambda: load_model_files(data_dir), repeats)
+    return {'load_models': result(min(times) * 1000, 'ms')}
+
+
+def bench_single_row(models, rows, repeats):
+    """make_prediction on one patient at a time, as the model buttons do"""
+    results = {}
+    for model_name, model in models.items():
+        features = iter(np.resize(rows, (repeats, rows.shape[1])))
+        times = repeat(lambda: make_prediction(model, *next(features)), repeats)
+        results[f'single_row/{model_name}'] = result(
+            percentile_ms(times, 50), 'ms', p99_ms=percentile_ms(times, 99)
+        )
+    return results
+
+
+def bench_batch(models, csv_path, sizes):
+    results = {}
+    for n_rows in sizes:
+        X = synthetic_rows(csv_path, n_rows)
+        for model_name, model in models.items():
+            seconds = min(repeat(lambda: predict_matrix(model, X), 1 if n_rows >= 100_000 else 3))
+            results[f'batch/{model_name}/{n_rows}'] = result(n_rows / seconds, 'rows/s', better='higher')
+    return results
+
+
+def bench_forest_engine(forest, csv_path, sizes):
+    """The flat Random Forest engine against sklearn, from one row to large cohorts
+
+    flat is the engine as served (sklearn takes over from SKLEARN_MIN_ROWS);
+    flat_walk always walks the node arrays, as after loading array artifacts.
+    """
+    engines = {'flat': FlatForest.from_sklearn(forest)}
+    engines['flat_walk'] = FlatForest.from_arrays(*engines['flat'].to_arrays())
+    results = {}
+    for n_rows in sizes:
+        X = synthetic_rows(csv_path, n_rows)
+        repeats = 1 if n_rows >= 100_000 else 3
+        sklearn_seconds = min(repeat(lambda: forest.predict_proba(X), repeats))
+        for engine, model in engines.items():
+            seconds = min(repeat(lambda: model.predict_proba(X), repeats))
+            results[f'forest_engine/{engine}/{n_rows}'] = result(
+                n_rows / seconds, 'rows/s', better='higher', vs_sklearn=sklearn_seconds / seconds
+            )
+    return results
+
+
+def bench_all_models(models, rows, repeats):
+    """EnsembleExecutor.run_single, what "All Models" does on a cache miss"""
+    executor = EnsembleExecutor(models)
+    features = iter(np.resize(rows, (repeats, rows.shape[1])))
+    times = repeat(lambda: executor.run_single(list(next(features))), repeats)
+    executor.close()
+    return {'all_models': result(percentile_ms(times, 50), 'ms', p99_ms=percentile_ms(times, 99))}
+
+
+def bench_eda(csv_path, sizes):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            path = os.path.join(tmp, f'rows_{n_rows}.csv')
+            write_rows(csv_path, n_rows, path)
+            start = time.perf_counter()
+            summarize_csv(path)
+            results[f'eda_aggregation/{n_rows}'] = result(time.perf_counter() - start, 's')
+    return results
+
+
+def run(args):
+    models = load_model_files(args.data_dir)
+    rows = synthetic_rows(args.csv, args.repeats)
+    results = {}
+    for name, bench in [
+        ('model load', lambda: bench_model_load(args.data_dir, 5)),
+        ('single-row latency', lambda: bench_single_row(models, rows, args.repeats)),
+        ('batch throughput', lambda: bench_batch(models, args.csv, args.batch_sizes)),
+        ('flat forest engine', lambda: bench_forest_engine(models['Random Forest'], args.csv,
+                                                           [1] + args.batch_sizes)),
+        ('All Models', lambda: bench_all_models(models, rows, args.repeats)),
+        ('EDA aggregation', lambda: bench_eda(args.csv, args.eda_sizes)),
+    ]:
+        print(f"Running {name}...", file=sys.stderr)
+        results.update(bench())
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'sklearn': sklearn.__version__,
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'cpu_count': os.cpu_count(),
+            'models': {model_name: model_signature(model_name, args.data_dir) for model_name in MODEL_FILES},
+        },
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    for key, entry in results.items():
+        print(f"{key:<45} {entry['value']:>14.3f} {entry['unit']}")
+    print(f"Wrote {args.out}")
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    with open(args.candidate) as f:
+        candidate = json.load(f)['results']
+
+    regressions = []
+    print(f"{'benchmark':<45} {'baseline':>12} {'candidate':>12} {'change':>8}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        old, new = baseline[key], candidate[key]
+        # Positive change is always worse, whichever direction the metric improves in
+        change = (new['value'] - old['value']) / old['value']
+        if old['better'] == 'higher':
+            change = -change
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions.append(key)
+        print(f"{key:<45} {old['value']:>12.3f} {new['value']:>12.3f} {change:>+8.1%}{flag}")
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{key:<45} only in {'baseline' if key in baseline else 'candidate'}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) worse than {args.threshold:.0%}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the heart disease models and data paths")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Run the benchmarks and write JSON results")
+    run_parser.add_argument('--out', default='benchmark.json')
+    run_parser.add_argument('--csv', default='heart-disease.csv')
+    run_parser.add_argument('--data-dir', default=DATA_DIR)
+    run_parser.add_argument('--repeats', type=int, default=200, help="Calls per latency benchmark")
+    run_parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    run_parser.add_argument('--eda-sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser('compare', help="Flag regressions between two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help="Relative slowdown that counts as a regression")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
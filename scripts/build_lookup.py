@@ -0,0 +1,54 @@
+# scripts/build_lookup.py
+"""Pre-score the Predictor input grid into memory-mapped risk tables
+
+Run with:  python -m scripts.build_lookup --out-dir Data/lookup [--grid grid.json]
+
+The optional grid file maps a feature to a list of values or to a
+"start:stop:step" range (stop inclusive); features left out use the
+default subset in core.lookup.DEFAULT_GRID.
+"""
+import argparse
+import json
+
+import numpy as np
+
+from core.lookup import DEFAULT_GRID, GridIndex, LookupTable, build_tables
+from core.models import load_model_files
+
+
+def read_grid(path):
+    grid = dict(DEFAULT_GRID)
+    if path:
+        with open(path) as file:
+            for feature, values in json.load(file).items():
+                if isinstance(values, str):
+                    start, stop, step = (float(part) for part in values.split(':'))
+                    values = np.round(np.arange(start, stop + step / 2, step), 6).tolist()
+                grid[feature] = values
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build precomputed risk lookup tables")
+    parser.add_argument('--out-dir', default='Data/lookup')
+    parser.add_argument('--grid', default=None, help="JSON file overriding the default grid")
+    parser.add_argument('--samples', type=int, default=10_000, help="Random cells checked against live inference")
+    parser.add_argument('--engine', action='append', default=[], metavar='MODEL=ENGINE',
+                        help="Engine used to build a model's table, e.g. 'Random Forest=flat'")
+    args = parser.parse_args()
+
+    grid = read_grid(args.grid)
+    print(f"Grid: {GridIndex(grid).size:,} cells")
+    models = load_model_files(engines=dict(option.split('=', 1) for option in args.engine))
+
+    for model_name, stats in build_tables(models, args.out_dir, grid).items():
+        print(f"{model_name:<22} {stats['bytes'] / 2**20:8.2f} MB  built in {stats['seconds']:.2f}s")
+
+    print("\nVerification against live predict_proba:")
+    for model_name, stats in LookupTable(args.out_dir).verify(models, args.samples).items():
+        print(f"{model_name:<22} max |diff| {stats['max_abs_diff']:.2e}, "
+              f"label agreement {stats['label_agreement']:.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# scripts/compact_forest.py
+"""Compare compacted Random Forest variants against the original on a holdout
+
+Every variant keeps a subset of the trees (picked to reproduce the full
+forest's probabilities), quantizes leaf rates to 8 or 16 bits, stores
+float32 thresholds and int16 node indices. The report lists memory, load
+time, single-row latency, ROC-AUC, accuracy and the largest probability
+change, so a size/quality point can be picked for production. With
+--save, the smallest variant within --max-auc-drop of the original is
+written as .npz (load it with CompactForest.load).
+
+Run with:  python -m scripts.compact_forest --holdout holdout.csv --trees 200 100 50 25 --save Data/random_forest_compact.npz
+"""
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score, roc_auc_score
+
+from core.batch import to_matrix
+from core.compact import CompactForest, select_trees
+from core.dataset import load_dataset
+from core.features import TARGET_COLUMN
+from core.forest import FlatForest
+from core.models import MODEL_FILES, model_dir
+
+
+def best_time(fn, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def load_pickle(path):
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+def sklearn_nbytes(forest):
+    """Node and value arrays held by the fitted trees"""
+    total = 0
+    for estimator in forest.estimators_:
+        state = estimator.tree_.__getstate__()
+        total += state['nodes'].nbytes + state['values'].nbytes
+    return total
+
+
+def row_latency_us(model, X, repeats):
+    """Median single-row predict_proba time in microseconds"""
+    times = []
+    for i in range(repeats):
+        row = X[i % len(X):i % len(X) + 1]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1e6)
+
+
+def measure(name, model, X, y, reference, memory_bytes, disk_bytes, load_ms, repeats):
+    positive = model.predict_proba(X)[:, 1]
+    return {
+        'variant': name,
+        'trees': len(model.estimators_) if hasattr(model, 'estimators_') else model.n_trees,
+        'memory_kb': memory_bytes / 1024,
+        'disk_kb': disk_bytes / 1024,
+        'load_ms': load_ms,
+        'row_us': row_latency_us(model, X, repeats),
+        'roc_auc': roc_auc_score(y, positive),
+        'accuracy': accuracy_score(y, model.classes_[(positive > 0.5).astype(int)]),
+        'max_prob_change': float(np.abs(positive - reference).max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report size and quality of compacted Random Forest variants")
+    parser.add_argument('--model', default=os.path.join(model_dir(), MODEL_FILES['Random Forest']))
+    parser.add_argument('--holdout', required=True,
+                        help="Labelled rows the model was not trained on (heart-disease.csv is the training set)")
+    parser.add_argument('--trees', type=int, nargs='+', default=[200, 100, 50, 25],
+                        help="Tree counts to try (the full forest is always included)")
+    parser.add_argument('--leaf-bits', type=int, nargs='+', default=[16, 8], choices=[8, 16])
+    parser.add_argument('--merge-tolerance', type=int, default=0,
+                        help="Merge sibling leaves whose quantized rates differ by at most this many steps")
+    parser.add_argument('--repeats', type=int, default=500, help="Single-row calls per latency measurement")
+    parser.add_argument('--max-auc-drop', type=float, default=0.005)
+    parser.add_argument('--save', help="Write the smallest variant within --max-auc-drop to this .npz")
+    parser.add_argument('--json', help="Also write the report rows to this file")
+    args = parser.parse_args()
+
+    data = load_dataset(args.holdout)
+    X, y = to_matrix(data), data[TARGET_COLUMN].to_numpy()
+
+    load_ms = best_time(lambda: load_pickle(args.model)) * 1000
+    forest = load_pickle(args.model)
+    flat = FlatForest.from_sklearn(forest)
+    reference = forest.predict_proba(X)[:, 1]
+    rows = [measure('sklearn', forest, X, y, reference, sklearn_nbytes(forest), os.path.getsize(args.model),
+                    load_ms, args.repeats)]
+
+    candidates = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'flat.npz')
+        flat.save(path)
+        rows.append(measure('flat', flat, X, y, reference, flat.nbytes, os.path.getsize(path),
+                            best_time(lambda: FlatForest.load(path)) * 1000, args.repeats))
+
+        for n_trees in sorted({flat.n_trees, *[n for n in args.trees if n < flat.n_trees]}, reverse=True):
+            trees = None if n_trees == flat.n_trees else select_trees(flat, X, n_trees)
+            for leaf_bits in args.leaf_bits:
+                name = f"compact/{n_trees}t/{leaf_bits}b"
+                compact = CompactForest.from_flat(flat, trees=trees, leaf_bits=leaf_bits,
+                                                  merge_tolerance=args.merge_tolerance)
+                path = os.path.join(tmp, f"{n_trees}_{leaf_bits}.npz")
+                compact.save(path)
+                rows.append(measure(name, compact, X, y, reference, compact.nbytes, os.path.getsize(path),
+                                    best_time(lambda: CompactForest.load(path)) * 1000, args.repeats))
+                candidates[name] = compact
+
+    print(f"{len(X)} holdout rows from {args.holdout}")
+    print(f"{'variant':<20} {'trees':>5} {'memory KB':>10} {'disk KB':>8} {'load ms':>8} {'row µs':>8} "
+          f"{'ROC-AUC':>8} {'accuracy':>8} {'max |Δp|':>9}")
+    for row in rows:
+        print(f"{row['variant']:<20} {row['trees']:>5} {row['memory_kb']:>10.1f} {row['disk_kb']:>8.1f} "
+              f"{row['load_ms']:>8.2f} {row['row_us']:>8.1f} {row['roc_auc']:>8.4f} {row['accuracy']:>8.4f} "
+              f"{row['max_prob_change']:>9.4f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+    if args.save:
+        acceptable = [row for row in rows if row['variant'] in candidates
+                      and row['roc_auc'] >= rows[0]['roc_auc'] - args.max_auc_drop]
+        if not acceptable:
+            print(f"No variant within {args.max_auc_drop} ROC-AUC of the original; nothing saved")
+            return
+        choice = min(acceptable, key=lambda row: row['memory_kb'])
+        candidates[choice['variant']].save(args.save)
+        print(f"Saved {choice['variant']} to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
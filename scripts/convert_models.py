@@ -0,0 +1,38 @@
+# scripts/convert_models.py
+"""Convert the pickled models into memory-mappable .npy arrays and a JSON manifest
+
+Run with:  python -m scripts.convert_models --out-dir Data/arrays
+"""
+import argparse
+import os
+import time
+
+from core.artifacts import ARTIFACT_DIR, LazyModels, convert_models
+from core.models import DATA_DIR, MODEL_FILES, load_model_files, model_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert Data/*.pkl into the array artifact format")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--out-dir', default=ARTIFACT_DIR)
+    args = parser.parse_args()
+
+    manifest = convert_models(args.data_dir, args.out_dir)
+    print(f"Wrote {len(manifest['models'])} models to {args.out_dir}")
+
+    start = time.perf_counter()
+    load_model_files(args.data_dir)
+    print(f"pickle load (all models):       {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    models = LazyModels(args.out_dir)
+    for model_name, entry in manifest['models'].items():
+        size = sum(os.path.getsize(os.path.join(args.out_dir, path)) for path in entry['arrays'].values())
+        start = time.perf_counter()
+        models[model_name]
+        print(f"{model_name + ' (' + entry['engine'] + ')':<32}{(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"{size / 1024:.0f} KB on disk "
+              f"(pickle {os.path.getsize(os.path.join(model_dir(args.data_dir), MODEL_FILES[model_name])) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
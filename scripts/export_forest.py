@@ -0,0 +1,28 @@
+# scripts/export_forest.py
+"""Export the pickled Random Forest into flat NumPy node arrays
+
+Run with:  python -m scripts.export_forest --output Data/random_forest_flat.npz
+"""
+import argparse
+import os
+import pickle
+
+from core.forest import FlatForest
+from core.models import DATA_DIR, MODEL_FILES, model_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the Random Forest to flat arrays")
+    parser.add_argument('--model', default=os.path.join(model_dir(), MODEL_FILES['Random Forest']))
+    parser.add_argument('--output', default=os.path.join(DATA_DIR, 'random_forest_flat.npz'))
+    args = parser.parse_args()
+
+    with open(args.model, 'rb') as file:
+        forest = FlatForest.from_sklearn(pickle.load(file))
+    forest.save(args.output)
+    print(f"Wrote {forest.n_trees} trees, {len(forest.threshold)} nodes "
+          f"({forest.nbytes / 1024:.0f} KB) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# scripts/importance.py
+"""Compute permutation and impurity feature importance for the served models
+
+The result is cached under Data/cache/importance/, keyed by model version
+and dataset hash, and the Data Information page renders it from there.
+
+Run with:  python -m scripts.importance --csv heart-disease.csv --repeats 30 --workers 4
+"""
+import argparse
+
+from core.importance import DEFAULT_REPEATS, compute_importance, importance_frame
+from core.models import DATA_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute global feature importance for every model")
+    parser.add_argument('--csv', default='heart-disease.csv', help="Labelled dataset or holdout to measure on")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="Shuffles per feature and model")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    report = compute_importance(args.csv, args.data_dir, repeats=args.repeats, workers=args.workers,
+                                seed=args.seed)
+    frame = importance_frame(report)
+    for (model_name, method), rows in frame.groupby(['model', 'method'], sort=False):
+        print(f"\n{model_name} ({method}, baseline ROC-AUC {report['baseline'][model_name]:.3f})")
+        for row in rows.sort_values('importance', ascending=False).itertuples():
+            print(f"  {row.feature:<10} {row.importance:>8.4f}  [{row.ci_low:.4f}, {row.ci_high:.4f}]")
+    print(f"\nModel version {report['model_version']}, {report['n_rows']} rows, {report['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# scripts/load_test.py
+"""Local load test for the inference server (python -m core.server)
+
+Run with:  python -m scripts.load_test --concurrency 64 --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from core.features import FEATURE_COLUMNS
+
+
+def build_bodies(csv_path, batch_size, count=256):
+    """Pre-encode request bodies sampled from the dataset"""
+    rows = pd.read_csv(csv_path)[FEATURE_COLUMNS].to_dict('records')
+    bodies = []
+    for _ in range(count):
+        sample = random.choices(rows, k=batch_size)
+        if batch_size == 1:
+            payload = {'features': sample[0]}
+        else:
+            payload = {'rows': sample}
+        bodies.append(json.dumps(payload).encode())
+    return bodies
+
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response and return its status code"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith('content-length:'):
+            length = int(line.split(':', 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, path, bodies, jobs, latencies, errors):
+    """One keep-alive connection sending requests until the job queue is empty"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            body = random.choice(bodies)
+            request = (
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    url = urlsplit(args.url)
+    path = '/predict' if args.batch_size == 1 else '/predict/batch'
+    bodies = build_bodies(args.csv, args.batch_size)
+
+    jobs = asyncio.Queue()
+    for _ in range(args.requests):
+        jobs.put_nowait(None)
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(url.hostname, url.port or 80, path, bodies, jobs, latencies, errors)
+        for _ in range(args.concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"Requests:    {len(latencies)} ({len(errors)} errors) in {elapsed:.2f}s")
+    print(f"Throughput:  {len(latencies) / elapsed:,.0f} req/s, "
+          f"{len(latencies) * args.batch_size / elapsed:,.0f} rows/s")
+    print(f"Latency p50: {np.percentile(latencies_ms, 50):.2f} ms")
+    print(f"Latency p99: {np.percentile(latencies_ms, 99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the heart disease inference server")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--csv', default='heart-disease.csv')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help="Rows per request (1 uses /predict, more uses /predict/batch)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# scripts/profile_startup.py
+"""Report import time and memory for each page and heavy library, and check the Home budget
+
+Every measurement runs in a fresh interpreter so earlier imports do not hide
+later costs. The Home check renders app.py with Streamlit's AppTest and
+fails if it takes longer than --budget-ms or loads any heavy library.
+
+Run with:  python -m scripts.profile_startup --budget-ms 1000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Libraries the landing page must render without
+HEAVY_MODULES = ['numpy', 'pandas', 'plotly.express', 'sklearn', 'scipy', 'pyarrow']
+LIBRARIES = ['streamlit'] + HEAVY_MODULES
+PAGES = ['pages.Home', 'pages.Data_Info', 'pages.EDA', 'pages.Predictor']
+
+
+def rss_mb():
+    # Second field of /proc/self/statm is the resident set in pages (Linux only)
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def measure(target):
+    """Import (or render) target in this process and return its cost; run in a child"""
+    if target.startswith('pages.') or target in ('models', 'home'):
+        # app.py has already imported streamlit before any page is loaded
+        import streamlit  # noqa: F401
+    baseline, start = rss_mb(), time.perf_counter()
+    if target == 'models':
+        from core.models import load_model_files
+        load_model_files()
+    elif target == 'home':
+        from streamlit.testing.v1 import AppTest
+        baseline, start = rss_mb(), time.perf_counter()
+        app = AppTest.from_file(os.path.abspath('app.py'), default_timeout=60)
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].value)
+    else:
+        __import__(target)
+    return {
+        'seconds': time.perf_counter() - start,
+        'rss_mb': rss_mb() - baseline,
+        'heavy_loaded': [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+
+
+def run_child(target):
+    output = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-m', 'scripts.profile_startup', '--child', target],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile app startup imports")
+    parser.add_argument('--budget-ms', type=float, default=1000,
+                        help="Maximum time for the first render of the Home page")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+        return
+
+    print(f"{'target':<18} {'import ms':>10} {'RSS MB':>8}  heavy libraries loaded")
+    for target in LIBRARIES + PAGES + ['models']:
+        result = run_child(target)
+        print(f"{target:<18} {result['seconds'] * 1000:>10.1f} {result['rss_mb']:>8.1f}  "
+              f"{', '.join(result['heavy_loaded']) or '-'}")
+
+    home = run_child('home')
+    within_budget = home['seconds'] * 1000 <= args.budget_ms
+    print(f"\nHome first render: {home['seconds'] * 1000:.1f} ms (budget {args.budget_ms:.0f} ms), "
+          f"{home['rss_mb']:.1f} MB, heavy libraries: {', '.join(home['heavy_loaded']) or 'none'}")
+    if not within_budget or home['heavy_loaded']:
+        print("FAIL: Home must render within budget without heavy libraries")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
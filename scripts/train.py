@@ -0,0 +1,42 @@
+# scripts/train.py
+"""Retrain and publish the three models from a labelled CSV
+
+Run with:  python -m scripts.train --csv heart-disease.csv --time-budget 3600
+"""
+import argparse
+import json
+import logging
+
+from core.dataset import load_dataset
+from core.models import DATA_DIR
+from core.training import train
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and version the heart disease models")
+    parser.add_argument('--csv', default='heart-disease.csv')
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--cv', type=int, default=5)
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Cores for the CV folds (-1 = all)")
+    parser.add_argument('--rf-candidates', type=int, default=200,
+                        help="Random Forest configurations entering successive halving")
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help="Seconds; stages starting later fit defaults, the forest search stops between rounds")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-publish', action='store_true',
+                        help="Write the version without making it the served one")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    version, metadata = train(
+        load_dataset(args.csv), args.data_dir, test_size=args.test_size, cv=args.cv,
+        n_jobs=args.n_jobs, rf_candidates=args.rf_candidates, time_budget=args.time_budget,
+        seed=args.seed, publish=not args.no_publish
+    )
+    print(f"Version {version}{'' if args.no_publish else ' (published)'}")
+    print(json.dumps(metadata['models'], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# scripts/update_models.py
+"""Fold newly labelled patients into the served models as a new version
+
+Run with:  python -m scripts.update_models --csv new_patients.csv
+"""
+import argparse
+import logging
+import sys
+
+from core.dataset import load_dataset
+from core.models import DATA_DIR
+from core.online import DEFAULT_MAX_ITER, DEFAULT_NEW_TREES, NotConverged, update_models
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally update the deployed models")
+    parser.add_argument('--csv', required=True, help="Labelled rows in the heart-disease.csv layout")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--new-trees', type=int, default=DEFAULT_NEW_TREES)
+    parser.add_argument('--max-iter', type=int, default=DEFAULT_MAX_ITER,
+                        help="lbfgs iterations for the warm-started logistic regression")
+    parser.add_argument('--no-publish', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        version = update_models(load_dataset(args.csv), args.data_dir, new_trees=args.new_trees,
+                                max_iter=args.max_iter, publish=not args.no_publish)
+    except NotConverged as e:
+        sys.exit(f"Update failed: {e}")
+    print(f"Version {version}{'' if args.no_publish else ' (published)'}")
+
+
+if __name__ == "__main__":
+    main()
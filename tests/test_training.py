@@ -0,0 +1,51 @@
+# tests/test_training.py
+import time
+
+import numpy as np
+import pytest
+
+from core.artifacts import LazyModels, convert_models
+from core.dataset import load_dataset
+from core.features import FEATURE_COLUMNS
+from core.models import load_model_files
+from core.training import train
+
+
+@pytest.fixture(scope='module')
+def data():
+    return load_dataset('heart-disease.csv')
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory, data):
+    data_dir = tmp_path_factory.mktemp('data')
+    version, metadata = train(data, str(data_dir), cv=2, n_jobs=1, rf_candidates=3)
+    return data_dir, version, metadata
+
+
+def test_trained_version_converts_to_artifacts(trained, data):
+    data_dir, _, _ = trained
+    out_dir = data_dir / 'arrays'
+    manifest = convert_models(str(data_dir), str(out_dir))
+
+    X = data[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    artifacts = LazyModels(str(out_dir))
+    for model_name, model in load_model_files(str(data_dir), engines={}).items():
+        assert model_name in manifest['models']
+        np.testing.assert_allclose(artifacts[model_name].predict_proba(X), model.predict_proba(X))
+
+
+def test_trained_params_are_plain_python(trained):
+    _, _, metadata = trained
+    for entry in metadata['models'].values():
+        for value in entry['params'].values():
+            assert not isinstance(value, np.generic)
+
+
+def test_time_budget_bounds_the_random_forest_search(tmp_path, data):
+    budget = 5
+    start = time.perf_counter()
+    _, metadata = train(data, str(tmp_path), cv=2, n_jobs=1, rf_candidates=200, time_budget=budget, publish=False)
+    # Without the budget the 200-candidate search alone takes minutes; fallbacks and saving take seconds
+    assert time.perf_counter() - start < budget + 10
+    assert set(metadata['models']) == {'Logistic Regression', 'K-Nearest Neighbors', 'Random Forest'}